@@ -12,7 +12,7 @@ from runez.convert import parsed_tabular, to_boolean, to_bytesize, to_float, to_
 from runez.convert import plural, represented_bytesize, represented_with_units
 from runez.date import date_from_epoch, datetime_from_epoch, elapsed, local_timezone, represented_duration, \
     timezone, timezone_from_text, to_date, to_datetime, to_epoch, to_epoch_ms, to_seconds, UTC
-from runez.file import basename, checksum, ensure_folder, parent_folder, readlines, TempFolder, to_path, touch, write
+from runez.file import basename, checksum, ensure_folder, parent_folder, readlines, tail, TempFolder, to_path, touch, write
 from runez.file import compress, copy, decompress, delete, filesize, ls_dir, move, symlink
 from runez.logsetup import LogManager as log, ProgressBar
 from runez.program import check_pid, is_executable, make_executable, run, shell, which
@@ -33,7 +33,7 @@ __all__ = [  # noqa: RUF022, grouped and sorted by provenance module
     "plural", "represented_bytesize", "represented_with_units",
     "date_from_epoch", "datetime_from_epoch", "elapsed", "local_timezone", "represented_duration",
     "timezone", "timezone_from_text", "to_date", "to_datetime", "to_epoch", "to_epoch_ms", "to_seconds", "UTC",
-    "basename", "checksum", "ensure_folder", "parent_folder", "readlines", "TempFolder", "to_path", "touch", "write",
+    "basename", "checksum", "ensure_folder", "parent_folder", "readlines", "tail", "TempFolder", "to_path", "touch", "write",
     "compress", "copy", "decompress", "delete", "filesize", "ls_dir", "move", "symlink",
     "log", "ProgressBar",
     "check_pid", "is_executable", "make_executable", "run", "shell", "which",
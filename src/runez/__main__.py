@@ -13,6 +13,34 @@ from runez.ascii import AsciiAnimation
 from runez.render import NAMED_BORDERS, PrettyTable
 
 
+def cmd_bench():
+    """Benchmark pyenv parsing and discovery hot paths"""
+    parser = runez.cli.parser()
+    parser.add_argument("--border", default="github", choices=NAMED_BORDERS, help="Use custom border.")
+    parser.add_argument("--pythons", "-p", type=int, default=10, help="Number of stub pythons in synthetic pyenv tree to scan.")
+    parser.add_argument("--size", "-s", type=int, default=1000, help="Number of items (versions, artifacts, specs) per round.")
+    parser.add_argument("--time", "-t", type=float, default=1.0, help="Minimum time in seconds to spend on each benchmark.")
+    parser.add_argument("name", nargs="*", help="Names of benchmarks to run (by default: all).")
+    args = parser.parse_args()
+
+    available = {name[7:].replace("_", "-"): func for name, func in globals().items() if name.startswith("_bench_")}
+    unknown = [x for x in args.name if x not in available]
+    if unknown:
+        sys.exit("Unknown benchmark(s): %s, available: %s" % (", ".join(unknown), ", ".join(available)))
+
+    table = PrettyTable("Benchmark,Ops/sec,Per op,Peak memory", border=args.border)
+    table.header[1].align = table.header[2].align = table.header[3].align = "right"
+    with runez.TempFolder(), _isolated_inspections():
+        _mk_stub_pyenv(args.pythons)
+        for name, func in available.items():
+            if not args.name or name in args.name:
+                bench_round = func(args)
+                ops, elapsed = _timed(bench_round, args.time)
+                table.add_row(name, f"{ops / elapsed:,.0f}", runez.represented_duration(elapsed / ops), _peak_memory(bench_round))
+
+    print(table)
+
+
 def cmd_colors():
     """Show a coloring sample"""
     parser = runez.cli.parser()
@@ -137,6 +165,120 @@ def main():
     runez.cli.run_cmds()
 
 
+def _bench_version_parse(args):
+    from runez.pyenv import Version
+
+    texts = _synthetic_versions(args.size)
+    return lambda: len([Version(x) for x in texts])
+
+
+def _bench_version_sort(args):
+    from runez.pyenv import Version
+
+    versions = [Version(x) for x in _synthetic_versions(args.size)]
+    return lambda: len(sorted(versions))
+
+
+def _bench_spec_from_text(args):
+    from runez.pyenv import PythonSpec
+
+    samples = ["3", "3.10", "py311", "python3.12", "3.13t", "3.9+", "cpython:3.11.2", "pypy:3.10", "conda:3.8+", "foo"]
+    texts = [samples[i % len(samples)] for i in range(args.size)]
+    return lambda: len([PythonSpec.from_text(x) for x in texts])
+
+
+def _bench_artifact_from_basename(args):
+    from runez.pyenv import ArtifactInfo
+
+    versions = _synthetic_versions(args.size // 4 or 1)
+    names = []
+    for i in range(args.size):
+        version = versions[i % len(versions)]
+        names.append("Some_Package-%s.tar.gz" % version if i % 2 else "some_package-%s-py3-none-any.whl" % version)
+
+    return lambda: len([ArtifactInfo.from_basename(x) for x in names])
+
+
+def _bench_depot_scan(_):
+    from runez.pyenv import PythonDepot, PythonSimpleInspection
+
+    def bench_round():
+        PythonSimpleInspection._cached = {}  # Each round inspects all stub pythons
+        return len(PythonDepot(".pyenv/versions/**").available_pythons)
+
+    return bench_round
+
+
+def _bench_depot_scan_cached(_):
+    from runez.pyenv import PythonDepot
+
+    return lambda: len(PythonDepot(".pyenv/versions/**").available_pythons)
+
+
+def _bench_depot_find(_):
+    from runez.pyenv import PythonDepot, PythonSimpleInspection
+
+    def bench_round():
+        PythonSimpleInspection._cached = {}
+        PythonDepot(".pyenv/versions/**").find_python("8.0")
+        return 1
+
+    return bench_round
+
+
+@contextlib.contextmanager
+def _isolated_inspections():
+    """Don't use (nor pollute) cached or persisted python inspections"""
+    from runez.pyenv import PythonSimpleInspection as psi
+
+    saved = psi._cached, psi.cache_path, psi._persisted, psi._persisted_path
+    psi._cached, psi.cache_path, psi._persisted, psi._persisted_path = {}, None, {}, None
+    try:
+        yield
+
+    finally:
+        psi._cached, psi.cache_path, psi._persisted, psi._persisted_path = saved
+
+
+def _mk_stub_pyenv(count):
+    """Synthetic pyenv-like tree, with stub pythons (shell scripts) reporting their version"""
+    for i in range(count):
+        folder = runez.to_path(".pyenv/versions/8.%s.1/bin" % i)
+        exe = folder / ("python8.%s" % i)
+        runez.write(exe, '#!/bin/sh\necho \'{"version": "8.%s.1", "machine": "x86_64"}\'\n' % i, logger=None)
+        runez.make_executable(exe, logger=None)
+        runez.symlink(exe.name, folder / "python", must_exist=False, logger=None)
+
+
+def _peak_memory(bench_round):
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        bench_round()
+        return runez.represented_bytesize(tracemalloc.get_traced_memory()[1])
+
+    finally:
+        tracemalloc.stop()
+
+
+def _synthetic_versions(count):
+    """Reproducible mix of typical versions, including pre/post/dev releases and local parts"""
+    suffixes = ["", "", "", "rc1", "a2", "b3", ".post1", ".dev4", "+local.5", "rc2.post3.dev1"]
+    return ["%s.%s.%s%s" % (i % 10, i * 7 % 31, i * 13 % 51, suffixes[i * 3 % len(suffixes)]) for i in range(count)]
+
+
+def _timed(bench_round, min_time):
+    """(int, float): Number of operations performed, and time it took, running `bench_round` repeatedly for at least `min_time`"""
+    ops = 0
+    start = time.perf_counter()
+    while True:
+        ops += bench_round()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return ops, elapsed
+
+
 def _show_fgcolors(bg=runez.plain, border=None):
     print("")
     table = PrettyTable("Color,Blink,Bold,Dim,Invert,Italic,Strikethrough,Underline", border=border)
@@ -1,14 +1,21 @@
 import contextlib
 import hashlib
 import io
+import itertools
 import os
+import secrets
 import shutil
+import stat
 import tempfile
 import time
+from collections.abc import Iterable
 from pathlib import Path
+from typing import IO
 
 from runez.system import _R, abort, Anchored, flattened, resolved_path, short, SYS_INFO, UNSET
 
+_EXTERNAL_COMPRESSORS = {"xz": "xz", "zst": "zstd"}  # Programs allowing to (de)compress using multiple threads
+
 
 def basename(path: str | Path, extension_marker=os.extsep, follow=False) -> str:
     """Base name of given `path`, ignoring extension if `extension_marker` is provided
@@ -296,6 +303,99 @@ def readlines(path: str | Path, first=None, errors="ignore", fatal=False, logger
         _R.hlog(logger, message, exc_info=e)
 
 
+def snapshot(path: str | Path, hash=None, previous: dict | None = None) -> dict[str, tuple]:
+    """Compact, picklable index of the file tree under `path`, see `diff()`
+
+    Args:
+        path: Folder to index
+        hash (callable | None): If provided, hash algorithm to use to also checksum files (eg hashlib.sha256)
+        previous (dict | None): Previous snapshot, checksums of files with same size/mtime/mode are reused from it (not recomputed)
+
+    Returns:
+        (dict): Relative path -> (size, mtime_ns, mode, checksum), checksum is None for folders or when no `hash` is provided
+    """
+    result = {}
+    _snapshot_scan(result, resolved_path(path), "", hash, previous or {})
+    return result
+
+
+def diff(old: dict[str, tuple], new: dict[str, tuple]):
+    """Differences between two snapshots obtained via `snapshot()`
+
+    Args:
+        old: Snapshot to compare from
+        new: Snapshot to compare to
+
+    Yields:
+        (str, str): Kind of change ("added", "removed" or "changed") and relative path, sorted by path
+    """
+    for relative_path in sorted(old.keys() | new.keys()):
+        a = old.get(relative_path)
+        b = new.get(relative_path)
+        if a is None:
+            yield "added", relative_path
+
+        elif b is None:
+            yield "removed", relative_path
+
+        elif stat.S_ISDIR(a[2]) and stat.S_ISDIR(b[2]):
+            if a[2] != b[2]:
+                yield "changed", relative_path  # Folder mtime changes with its contents, which are reported individually
+
+        elif a[3] is not None and b[3] is not None:
+            if a[2:] != b[2:]:
+                yield "changed", relative_path  # Both have checksums: compare them (and mode), mtime doesn't matter
+
+        elif a[:3] != b[:3]:
+            yield "changed", relative_path
+
+
+def tail(path: str | Path, count=10, follow=False, interval=0.5, errors="ignore", fatal=False, logger=False, transform=str.rstrip):
+    """Last `count` lines of file with `path`, similar to `tail -n`: file is read backwards by blocks (not scanned from its start)
+
+    Args:
+        path: Path to file to read lines from
+        count (int): Number of lines to yield from the end of file
+        follow (bool): If True, keep yielding lines as they get appended to the file (similar to `tail -F`), never returns
+        interval (float): How many seconds to wait between checks for new lines, in follow mode
+        errors (str | None): Optional string specifying how encoding errors are to be handled
+        fatal (type | bool | None): True: abort execution on failure, False: don't abort but log, None: don't abort, don't log
+        logger (callable | bool | None): Logger to use, True to print(), False to trace(), None to disable log chatter
+        transform (callable | None): Optional callable to transform each line
+
+    Yields:
+        (str): Lines read, newlines and trailing spaces stripped
+    """
+    path = resolved_path(path)
+    try:
+        fh = io.open(path, "rb")  # noqa: SIM115, closed in 'finally' clause below (handle may get replaced in follow mode)
+
+    except Exception as e:
+        message = "Can't read %s" % short(path)
+        if fatal:
+            abort(_R.actual_message(message), exc_info=e, fatal=fatal, logger=logger)
+
+        _R.hlog(logger, message, exc_info=e)
+        return
+
+    try:
+        for line in _last_lines(fh, count):
+            yield _decoded_line(line, errors, transform)
+
+        while follow:
+            yield from _appended_lines(fh, errors, transform)
+            time.sleep(interval)
+            rotated = _reopened_if_rotated(fh, path)
+            if rotated is not fh:
+                # Yield lines that got appended to rotated file since last check, before switching to the new file
+                yield from _appended_lines(fh, errors, transform, final=True)
+                fh.close()
+                fh = rotated
+
+    finally:
+        fh.close()
+
+
 def to_path(path: str | Path, no_spaces=False) -> Path:
     """
     Args:
@@ -349,13 +449,24 @@ def symlink(source: str | Path, destination: str | Path, must_exist=True, overwr
     return _file_op(source, destination, _symlink, overwrite, fatal, logger, dryrun, must_exist=must_exist)
 
 
-def compress(source: str | Path, destination: str | Path, arcname=UNSET, ext=None, overwrite=True, fatal=True, logger=UNSET, dryrun=UNSET):
+def compress(
+    source: str | Path,
+    destination: str | Path,
+    arcname=UNSET,
+    ext=None,
+    threads=None,
+    overwrite=True,
+    fatal=True,
+    logger=UNSET,
+    dryrun=UNSET,
+):
     """
     Args:
         source: Source folder to compress
         destination: Destination folder
         arcname (str | None): Name of subfolder in archive (default: source basename)
         ext (str | None): Extension determining compression (default: extension of given 'source' file)
+        threads (int | None): Number of threads to use for 'xz' and 'zst' compression (0: one per core, None: single-threaded)
         overwrite (bool | None): True: replace existing, False: fail if destination exists, None: no destination check
         fatal (type | bool | None): True: abort execution on failure, False: don't abort but log, None: don't abort, don't log
         logger (callable | bool | None): Logger to use, True to print(), False to trace(), None to disable log chatter
@@ -383,6 +494,7 @@ def compress(source: str | Path, destination: str | Path, arcname=UNSET, ext=Non
     else:
         func = _tar
         kwargs["mode"] = "w:" if ext == "tar" else "w:%s" % ext
+        kwargs["threads"] = threads
 
     return _file_op(source, destination, func, overwrite, fatal, logger, dryrun, arcname=arcname, **kwargs)
 
@@ -412,8 +524,10 @@ def decompress(
         message = f"Unknown extension '{os.path.basename(source)}': can't decompress file"
         return abort(message, return_value=-1, fatal=fatal, logger=logger)
 
-    func = _unzip if ext == "zip" else _untar
-    return _file_op(source, destination, func, overwrite, fatal, logger, dryrun, simplify=simplify)
+    if ext == "zip":
+        return _file_op(source, destination, _unzip, overwrite, fatal, logger, dryrun, simplify=simplify)
+
+    return _file_op(source, destination, _untar, overwrite, fatal, logger, dryrun, simplify=simplify, ext=ext)
 
 
 class TempFolder:
@@ -473,12 +587,16 @@ def touch(path: str | Path, fatal=True, logger=UNSET, dryrun=UNSET):
     return write(path, None, fatal=fatal, logger=logger, dryrun=dryrun)
 
 
-def write(path: str | Path, contents: str | bytes | None, fatal=True, logger=UNSET, dryrun=UNSET):
+def write(
+    path: str | Path, contents: str | bytes | Iterable | IO | None, atomic=False, fsync=False, fatal=True, logger=UNSET, dryrun=UNSET
+):
     """Write `contents` to file with `path`
 
     Args:
         path: Path to file
-        contents: Contents to write (only touch file if None)
+        contents: Contents to write (only touch file if None), can be an iterable of chunks, or a file-like object to stream from
+        atomic (bool): If True, write to a temp file first, then rename it to `path` (readers never see a partially written file)
+        fsync (bool): If True, ensure written data is flushed to disk before returning (along with parent folder, in atomic mode)
         fatal (type | bool | None): True: abort execution on failure, False: don't abort but log, None: don't abort, don't log
         logger (callable | bool | None): Logger to use, True to print(), False to trace(), None to disable log chatter
         dryrun (bool | UNSET | None): Optionally override current dryrun setting
@@ -493,13 +611,13 @@ def write(path: str | Path, contents: str | bytes | None, fatal=True, logger=UNS
 
     ensure_folder(parent_folder(path), fatal=fatal, logger=None, dryrun=dryrun)
     try:
-        mode = "wb" if isinstance(contents, bytes) else "wt"
-        with io.open(path, mode) as fh:
-            if contents is None:
+        binary, chunks = _binary_chunks(contents)
+        with _open_for_write(path, "wb" if binary else "wt", atomic=atomic, fsync=fsync) as fh:
+            if contents is None and not atomic:
                 os.utime(path, None)
 
-            else:
-                fh.write(contents)
+            for chunk in chunks:
+                fh.write(chunk)
 
         _R.hlog(logger, "%s %s" % ("Wrote" if contents else "Touched", short_path))
 
@@ -510,6 +628,136 @@ def write(path: str | Path, contents: str | bytes | None, fatal=True, logger=UNS
         return 1
 
 
+def _binary_chunks(contents, blocksize=65536):
+    """
+    Args:
+        contents (str | bytes | Iterable | IO | None): Contents to write, as accepted by `write()`
+        blocksize (int): Read block size, for file-like `contents`
+
+    Returns:
+        (bool, Iterable): True if contents are binary, and the chunks to write
+    """
+    if contents is None:
+        return False, ()
+
+    if isinstance(contents, (str, bytes)):
+        return isinstance(contents, bytes), (contents,)
+
+    if hasattr(contents, "read"):
+        empty = contents.read(0)
+        return isinstance(empty, bytes), iter(lambda: contents.read(blocksize), empty)
+
+    chunks = iter(contents)
+    first = next(chunks, None)
+    if first is None:
+        return False, ()
+
+    return isinstance(first, bytes), itertools.chain((first,), chunks)
+
+
+@contextlib.contextmanager
+def _open_for_write(path: str, mode: str, atomic=False, fsync=False):
+    """Context manager yielding a file handle to write to `path`
+
+    Args:
+        path: Path to file
+        mode: Mode to open file with ("wt" or "wb")
+        atomic: If True, write to a temp file in the same folder, then rename it to `path`
+        fsync: If True, flush written data to disk (along with parent folder, in atomic mode)
+    """
+    if not atomic:
+        with io.open(path, mode) as fh:
+            yield fh
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+
+        return
+
+    path = os.path.realpath(path)  # Replace target of symlink, not the symlink itself
+    folder, name = os.path.split(path)
+    tmp_path = os.path.join(folder, ".%s.%s.tmp" % (name, secrets.token_hex(4)))
+    try:
+        with io.open(tmp_path, mode.replace("w", "x")) as fh:
+            yield fh
+            fh.flush()
+            if fsync:
+                os.fsync(fh.fileno())
+
+        if os.path.exists(path):
+            shutil.copymode(path, tmp_path)
+
+        os.replace(tmp_path, path)
+        if fsync:
+            fd = os.open(folder, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+
+            finally:
+                os.close(fd)
+
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _decoded_line(line: bytes, errors, transform):
+    line = line.decode("utf-8", errors=errors or "strict")
+    return transform(line) if transform else line
+
+
+def _last_lines(fh, count, blocksize=65536):
+    """Last `count` lines of binary file handle `fh`, leaves `fh` positioned at the end of the file"""
+    end = position = fh.seek(0, os.SEEK_END)
+    blocks = []
+    newlines = 0
+    while count > 0 and position > 0 and newlines <= count:
+        size = min(blocksize, position)
+        position -= size
+        fh.seek(position)
+        block = fh.read(size)
+        blocks.append(block)
+        newlines += block.count(b"\n")
+
+    fh.seek(end)
+    if count <= 0:
+        return []
+
+    return b"".join(reversed(blocks)).splitlines(keepends=True)[-count:]
+
+
+def _appended_lines(fh, errors, transform, final=False):
+    """Lines appended to binary file handle `fh` since last read, a partially written last line is yielded only if `final`"""
+    line = fh.readline()
+    while line.endswith(b"\n"):
+        yield _decoded_line(line, errors, transform)
+        line = fh.readline()
+
+    if line:
+        if final:
+            yield _decoded_line(line, errors, transform)
+
+        else:
+            fh.seek(-len(line), os.SEEK_CUR)  # Partially written line, wait for it to be complete
+
+
+def _reopened_if_rotated(fh, path):
+    """Handle of `path` to keep following: a new handle if file was rotated (caller closes `fh`), rewound `fh` if truncated"""
+    try:
+        st = os.stat(path)
+
+    except OSError:
+        return fh  # File was moved away, and not recreated yet: keep reading from current handle until it is
+
+    if st.st_ino != os.fstat(fh.fileno()).st_ino:
+        return io.open(path, "rb")
+
+    if st.st_size < fh.tell():
+        fh.seek(0)
+
+    return fh
+
+
 def _copy(source, destination, ignore=None):
     """Effective copy"""
     if os.path.isdir(source):
@@ -555,12 +803,60 @@ def _symlink(source, destination):
     os.symlink(source, destination)
 
 
-def _tar(source, destination, arcname, mode):
+def _snapshot_scan(result, folder, prefix, hash, previous):
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            relative_path = prefix + entry.name
+            st = entry.stat(follow_symlinks=False)
+            is_dir = entry.is_dir(follow_symlinks=False)
+            size = 0 if is_dir else st.st_size
+            digest = None
+            if hash is not None and not is_dir:
+                prev = previous.get(relative_path)
+                if prev is not None and prev[:3] == (size, st.st_mtime_ns, st.st_mode):
+                    digest = prev[3]
+
+                if digest is None:
+                    digest = os.readlink(entry.path) if entry.is_symlink() else checksum(entry.path, hash=hash)
+
+            result[relative_path] = (size, st.st_mtime_ns, st.st_mode, digest)
+            if is_dir:
+                _snapshot_scan(result, entry.path, relative_path + "/", hash, previous)
+
+
+def _tar(source, destination, arcname, mode, threads=None):
     """Effective tar"""
     import tarfile
 
     source = to_path(source)
+    destination = to_path(destination)
     delete(destination, fatal=False, logger=None, dryrun=False)
+    ext = mode.partition(":")[2]
+    native = ext in tarfile.TarFile.OPEN_METH
+    if ext in _EXTERNAL_COMPRESSORS and (threads is not None or not native):
+        zstandard = ext == "zst" and _zstandard_module()
+        if zstandard:
+            compressor = zstandard.ZstdCompressor(threads=-1 if threads == 0 else threads or 0)
+            with open(destination, "wb") as raw, compressor.stream_writer(raw) as zfh, tarfile.open(fileobj=zfh, mode="w|") as fh:
+                fh.add(source, arcname=arcname, recursive=True)
+
+            return
+
+        if not native or _external_compressor(ext):
+            # Tar first, then let 'xz' or 'zstd' compress it (using multiple threads if requested)
+            tmp_tar = destination.with_name(".%s.tar" % destination.name)
+            try:
+                with tarfile.open(tmp_tar, mode="w:") as fh:
+                    fh.add(source, arcname=arcname, recursive=True)
+
+                args = [] if threads is None else ["-T%s" % threads]
+                _run_external_compressor(ext, tmp_tar, destination, *args)
+
+            finally:
+                delete(tmp_tar, fatal=False, logger=None, dryrun=False)
+
+            return
+
     with tarfile.open(destination, mode=mode) as fh:
         fh.add(source, arcname=arcname, recursive=True)
 
@@ -576,7 +872,7 @@ def _move_extracted(extracted_source, destination, simplify):
     _move(extracted_source, destination)
 
 
-def _untar(source, destination, simplify):
+def _untar(source, destination, simplify, ext=None):
     """Effective untar"""
     import tarfile
 
@@ -584,12 +880,56 @@ def _untar(source, destination, simplify):
     destination = to_path(destination).absolute()
     with TempFolder():
         extracted_source = to_path(source.name)
+        if ext in _EXTERNAL_COMPRESSORS and ext not in tarfile.TarFile.OPEN_METH:
+            zstandard = ext == "zst" and _zstandard_module()
+            if zstandard:
+                decompressor = zstandard.ZstdDecompressor()
+                with open(source, "rb") as raw, decompressor.stream_reader(raw) as zfh, tarfile.open(fileobj=zfh, mode="r|") as fh:
+                    fh.extractall(extracted_source, filter="data")
+
+                _move_extracted(extracted_source, destination, simplify)
+                return
+
+            tmp_tar = to_path("%s.tar" % source.name)
+            _run_external_compressor(ext, source, tmp_tar, "-d")
+            source = tmp_tar
+
         with tarfile.open(source) as fh:
             fh.extractall(extracted_source, filter="data")
 
         _move_extracted(extracted_source, destination, simplify)
 
 
+def _external_compressor(ext):
+    """Full path to external program able to (de)compress 'ext' files, if installed"""
+    from runez.program import which
+
+    return which(_EXTERNAL_COMPRESSORS.get(ext))
+
+
+def _run_external_compressor(ext, source, destination, *args):
+    """Run 'xz' or 'zstd' on 'source', writing its output to 'destination'"""
+    from runez.program import run
+
+    program = _external_compressor(ext)
+    if not program:
+        raise FileNotFoundError("%s is not installed" % _EXTERNAL_COMPRESSORS[ext])
+
+    with open(destination, "wb") as fh:
+        r = run(program, "-q", *args, "-c", source, stdout=fh, dryrun=False, fatal=False, logger=None)
+
+    if r.failed:
+        raise OSError(r.error or "%s exited with code %s" % (short(program), r.exit_code))
+
+
+def _zstandard_module():
+    """Optional 'zstandard' module, if installed"""
+    with contextlib.suppress(ImportError):
+        import zstandard  # type: ignore[import-not-found]
+
+        return zstandard
+
+
 def _unzip(source, destination, simplify):
     """Effective unzip"""
     from zipfile import ZipFile
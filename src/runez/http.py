@@ -32,11 +32,13 @@ import json
 import os
 import re
 import sys
+import time
 import urllib.parse
 from pathlib import Path
 from typing import ClassVar
 
-from runez.file import checksum, decompress, delete, ensure_folder, TempFolder, to_path
+from runez.file import checksum, decompress, delete, ensure_folder, filesize, TempFolder, to_path
+from runez.heartbeat import HeartbeatTask
 from runez.system import _R, abort, DEV, find_caller, joined, short, stringified, SYS_INFO, UNSET
 
 
@@ -172,6 +174,130 @@ class CacheWrapper:
         return self.cache_backend.set(cache_key, data, expire=expire)
 
 
+class CacheEntry:
+    """Top-level file or folder in a cache folder, as seen by `CacheJanitor`"""
+
+    def __init__(self, path, size, last_used):
+        """
+        Args:
+            path (str): Path to file or folder
+            size (int): Total size in bytes (of all files in folder, for folders)
+            last_used (float): Epoch when this entry was last accessed or modified (most recent of all files in it, for folders)
+        """
+        self.path = path
+        self.size = size
+        self.last_used = last_used
+
+    def __repr__(self):
+        return "%s (%s)" % (short(self.path), _R.lc.rm.represented_bytesize(self.size))
+
+    @classmethod
+    def from_path(cls, path):
+        """
+        Args:
+            path (str): Path to file or folder
+
+        Returns:
+            (CacheEntry): Corresponding entry, with total size and last usage time
+        """
+        st = os.lstat(path)
+        if not os.path.isdir(path) or os.path.islink(path):
+            return cls(path, st.st_size, max(st.st_atime, st.st_mtime))
+
+        # Folders' own atime/mtime get bumped by listing or creating their contents, look at the files they contain instead
+        last_used = None
+        for root, _, files in os.walk(path):
+            for fname in files:
+                with contextlib.suppress(OSError):  # File may have been concurrently deleted
+                    st = os.lstat(os.path.join(root, fname))
+                    last_used = max(last_used or 0, st.st_atime, st.st_mtime)
+
+        if last_used is None:
+            last_used = os.path.getmtime(path)  # Empty folder
+
+        return cls(path, filesize(path), last_used)
+
+
+class CacheJanitor(HeartbeatTask):
+    """
+    Keep a cache folder within a size budget and max age, evicting least recently used entries first.
+    Each top-level file or folder in the cache folder is considered as one entry (sub-folders are deleted as a whole).
+
+    Example usage:
+        janitor = CacheJanitor(size_limit="4g", max_age="30d")  # Default folder: CacheWrapper.cache_base_path()
+        janitor.clean(dryrun=True)  # Report what would be deleted
+        Heartbeat.add_task(janitor)  # Or clean up periodically, in the background
+    """
+
+    def __init__(self, folder=UNSET, size_limit=UNSET, max_age=None, frequency="1h", logger=UNSET):
+        """
+        Args:
+            folder (str | Path | None): Cache folder to keep tidy (default: CacheWrapper.cache_base_path())
+            size_limit (int | str | None): Max total size for this cache (default: CacheWrapper.size_limit)
+            max_age (int | str | None): Delete entries not used for that long (in seconds, or duration like "30d")
+            frequency (int | str): How often to clean up, when used as a Heartbeat task (in seconds, or duration like "1h")
+            logger (callable | bool | None): Logger to use, True to print(), False to trace(), None to disable log chatter
+        """
+        super().__init__(frequency=_R.lc.rm.to_seconds(frequency))
+        if folder is UNSET:
+            folder = CacheWrapper.cache_base_path()
+
+        if size_limit is UNSET:
+            size_limit = CacheWrapper.size_limit
+
+        self.folder = folder and str(folder)
+        self.size_limit = _R.lc.rm.to_bytesize(size_limit)
+        self.max_age = _R.lc.rm.to_seconds(max_age)
+        self.logger = logger
+
+    def __repr__(self):
+        return "%s %s" % (self.name, short(self.folder))
+
+    def entries(self):
+        """
+        Returns:
+            (list[CacheEntry]): Entries currently in cache folder, least recently used first
+        """
+        result = []
+        if self.folder and os.path.isdir(self.folder):
+            for fname in os.listdir(self.folder):
+                with contextlib.suppress(OSError):  # Entry may have been concurrently deleted
+                    result.append(CacheEntry.from_path(os.path.join(self.folder, fname)))
+
+        return sorted(result, key=lambda x: x.last_used)
+
+    def clean(self, dryrun=UNSET):
+        """
+        Args:
+            dryrun (bool | UNSET | None): Optionally override current dryrun setting
+
+        Returns:
+            (list[CacheEntry]): Entries that were (or would be, in dryrun mode) deleted
+        """
+        entries = self.entries()
+        total_size = sum(x.size for x in entries)
+        cutoff = self.max_age and time.time() - self.max_age
+        evicted = []
+        for entry in entries:
+            if not (cutoff and entry.last_used < cutoff) and not (self.size_limit and total_size > self.size_limit):
+                break  # Remaining entries are more recent, and we're within budget
+
+            if delete(entry.path, fatal=False, logger=None, dryrun=dryrun) > 0:
+                evicted.append(entry)
+                total_size -= entry.size
+
+        if evicted:
+            freed = _R.lc.rm.represented_bytesize(sum(x.size for x in evicted))
+            msg = "%s (%s) from %s" % (_R.lc.rm.plural(evicted, "cache entry"), freed, short(self.folder))
+            if not _R.hdry(dryrun, self.logger, "clean %s" % msg):
+                _R.hlog(self.logger, "Cleaned %s" % msg)
+
+        return evicted
+
+    def execute(self):
+        self.clean()
+
+
 class ForbiddenHttpError(Exception):
     """Raised to signify test setup prevented a remote call"""
 
@@ -499,6 +625,21 @@ class RestResponse:
     def content(self):
         return self.raw_response.content
 
+    def iter_content(self, chunk_size=65536):
+        """
+        Args:
+            chunk_size (int): Size of chunks to read at a time
+
+        Yields:
+            (bytes): Content of response, chunk by chunk (use `stream=True` when querying, to avoid loading it all in memory)
+        """
+        iter_content = getattr(self.raw_response, "iter_content", None)
+        if iter_content is None:
+            yield self.content  # Mocked or cached response, content is already in memory
+            return
+
+        yield from iter_content(chunk_size=chunk_size)
+
     @property
     def ok(self):
         return self.status_code and self.status_code < 400
@@ -4,20 +4,32 @@ Convenience logging setup
 
 from __future__ import annotations
 
+import atexit
+import copy
 import faulthandler
+import functools
+import json
 import logging
+import math
 import os
+import queue
+import random
+import re
+import shutil
 import signal
 import sys
 import threading
 import time
-from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
-from typing import Callable, Protocol
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import BaseRotatingHandler, QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+from typing import Callable, ClassVar, Protocol
 
 from runez.ascii import AsciiAnimation
 from runez.convert import to_bytesize, to_int
-from runez.date import local_timezone, represented_duration
-from runez.file import parent_folder
+from runez.date import local_timezone, represented_duration, to_seconds
+from runez.file import _external_compressor, _run_external_compressor, _zstandard_module, parent_folder
+from runez.heartbeat import Heartbeat, HeartbeatTask
 from runez.system import (
     _R,
     abort_if,
@@ -45,16 +57,19 @@ def formatted(message, *args, **named_values):
     Returns:
         (str): Formatted message
     """
-    if not named_values:
-        if not args:
-            return message
+    if not named_values and not args:
+        return message
 
-        if "%s" in message:
-            try:
-                return message % args
+    style = _format_style(message) if isinstance(message, str) else "{"
+    if style is None:
+        return message  # No formatting markers, nothing to format
 
-            except TypeError:
-                pass
+    if style == "%" and not named_values:
+        try:
+            return message % args
+
+        except TypeError:
+            pass
 
     try:
         return message.format(*args, **named_values)
@@ -63,6 +78,24 @@ def formatted(message, *args, **named_values):
         return message
 
 
+@functools.lru_cache(maxsize=1024)
+def _format_style(message):
+    """
+    Args:
+        message (str): Message template
+
+    Returns:
+        (str | None): "%" if '%s' markers are used, "{" if format() could apply, None if 'message' has no formatting markers
+    """
+    if "%s" in message:
+        return "%"
+
+    if "{" in message or "}" in message:
+        return "{"
+
+    return None
+
+
 class ProgressHandler(logging.Handler):
     """Used to capture logging chatter and show it as progress"""
 
@@ -121,9 +154,10 @@ class ProgressBar:
     def update(self, n=1):
         """Manually update the progress bar, advance progress by 'n'"""
         self.n += n
+        LogManager.progress._notify()
 
     def rendered(self) -> str:
-        """Called in spinner thread (lock already acquired)"""
+        """Called in spinner thread"""
         percent = max(0, round(100.0 * self.n / max(1, self.total)))
         blanks = 0
         if percent >= 100:
@@ -159,7 +193,7 @@ class _SpinnerComponent:
         self.current_text: str | None = None
 
     def add_text(self, line, columns):
-        """(int): size of text added to 'line' (lock already acquired)"""
+        """(int): size of text added to 'line', called by spinner thread"""
         text = self.current_text
         if not text or columns <= 0:
             return 0
@@ -176,7 +210,7 @@ class _SpinnerComponent:
         return size
 
     def update_text(self, ts):
-        """(int): 1 if changed, 0 otherwise, called by spinner thread (lock already acquired)"""
+        """(int): 1 if changed, 0 otherwise, called by spinner thread"""
         if self.next_update < ts:
             self.next_update = ts + self.update_delay
             text = self.source()
@@ -213,10 +247,10 @@ class _SpinnerState:
         self.frames = _SpinnerComponent(frames.fps, frames.next_frame, spinner_color)
         self.progress_bar = _SpinnerComponent(2, parent._get_progress, progress_color)
         self.message = _SpinnerComponent(2, parent._get_message, message_color, adapter=uncolored)
-        self.max_fps = max(2, frames.fps)
+        self.animated = bool(frames.frames)
 
     def get_line(self, ts):
-        """Called by spinner thread (lock already acquired)"""
+        """Called by spinner thread"""
         n = self.frames.update_text(ts) + self.progress_bar.update_text(ts) + self.message.update_text(ts)
         if n > 0:
             line = []
@@ -226,6 +260,25 @@ class _SpinnerState:
             self.message.add_text(line, columns)
             return " %s" % " ".join(line) if line else ""
 
+    def is_due(self, ts):
+        """(bool): True if progress bar and message will be refreshed by a get_line(ts) call"""
+        return self.progress_bar.next_update < ts and self.message.next_update < ts
+
+    def next_deadline(self, pending):
+        """
+        Args:
+            pending (bool): True if progress bar or message changed since they were last refreshed
+
+        Returns:
+            (float | None): When spinner thread should wake up next (None: only when notified)
+        """
+        deadline = self.frames.next_update if self.animated else None
+        if pending:
+            due = max(self.progress_bar.next_update, self.message.next_update)
+            deadline = due if deadline is None else min(deadline, due)
+
+        return deadline
+
 
 class ProgressSpinner:
     """
@@ -242,8 +295,7 @@ class ProgressSpinner:
     def __init__(self):
         self.is_running = False
         self._current_line = None
-        self._fps = 60.0  # Higher fps for _run(), to reduce flickering as much as possible
-        self._has_progress_line = False
+        self._has_progress_line = None  # True: progress line shown, False: partial line written by user pending, None: neither
         self._msg_show: str | None = None  # Message coming from show() calls
         self._msg_debug: str | None = None  # Message coming from trace() or debug() calls
         self._progress_bar: ProgressBar | None = None
@@ -251,14 +303,15 @@ class ProgressSpinner:
         self._stderr_write: Callable[[str], int] | None = None
         self._stdout_write: Callable[[str], int] | None = None
         self._thread: threading.Thread | None = None  # Background daemon thread used to display progress
+        self._wakeup = threading.Event()  # Wakes up spinner thread when there is something new to show
 
     def show(self, message):
         """
         Args:
             message (str | None): Show 'message' on progress spinner line (this overrides any debug/trace inferred messages)
         """
-        with self._lock:
-            self._msg_show = message
+        self._msg_show = message
+        self._notify()
 
     def start(
         self,
@@ -303,6 +356,7 @@ class ProgressSpinner:
             self._thread = None
             self._state = None
 
+        self._wakeup.set()
         attempts = 10
         while attempts > 0:
             with self._lock:
@@ -317,7 +371,7 @@ class ProgressSpinner:
             LogManager._auto_enable_progress_handler()
             if self._has_progress_line:
                 self._clear_line()
-                self._has_progress_line = False
+                self._has_progress_line = None
 
             if self._stdout_write is not None and sys.stdout.write == self._on_stdout:
                 sys.stdout.write = self._stdout_write
@@ -332,17 +386,22 @@ class ProgressSpinner:
     def _lock(self):
         return threading.RLock()
 
+    def _notify(self):
+        """Wake up spinner thread, called in any thread (no lock needed, this gets called on every debug log record)"""
+        if self.is_running and not self._wakeup.is_set():
+            self._wakeup.set()
+
     def _show_debug(self, message):
-        """Show 'message' on next progress line update, called in main thread"""
-        with self._lock:
-            self._msg_debug = message
+        """Show 'message' on next progress line update, called in any thread"""
+        self._msg_debug = message
+        self._notify()
 
     def _get_message(self):
-        """Called in spinner thread (lock already acquired)"""
+        """Called in spinner thread"""
         return self._msg_show or self._msg_debug
 
     def _get_progress(self):
-        """Called in spinner thread (lock already acquired)"""
+        """Called in spinner thread"""
         if self._progress_bar:
             return self._progress_bar.rendered()
 
@@ -353,6 +412,8 @@ class ProgressSpinner:
                 bar.parent = self._progress_bar
                 self._progress_bar = bar
 
+        self._notify()
+
     def _remove_progress_bar(self, bar):
         """Called in main thread"""
         with self._lock:
@@ -362,6 +423,8 @@ class ProgressSpinner:
             elif self._progress_bar:
                 self._progress_bar._remove_parent(bar)
 
+        self._notify()
+
     @staticmethod
     def _original_write(stream):
         """Called in main thread (lock already acquired)"""
@@ -373,10 +436,14 @@ class ProgressSpinner:
         with self._lock:
             if self._has_progress_line:
                 self._clear_line()
-                self._has_progress_line = False
 
-            if self._has_progress_line is False and message.endswith("\n"):
-                self._has_progress_line = None
+            if message.endswith("\n"):
+                if self._has_progress_line is not None:
+                    self._has_progress_line = None
+                    self._notify()  # Progress line was cleared (or held back by a partial line), redraw it
+
+            elif message:
+                self._has_progress_line = False  # Don't draw progress line over a partially written line, until it is complete
 
             return write(message)
 
@@ -398,28 +465,37 @@ class ProgressSpinner:
             self._stderr_write(text)
 
     def _run(self):
-        """Background thread handling progress reporting and animation"""
+        """Background thread handling progress reporting and animation, redraws only when notified or when next frame is due"""
         try:
             state = self._state
             if state is not None:
-                sleep_delay = 1 / self._fps
-                frequency = int(self._fps / state.max_fps) - 1
-                countdown = 0
                 line = None
+                pending = True
                 while self._thread:
-                    time.sleep(sleep_delay)
-                    countdown -= 1
-                    if countdown < 0 or self._has_progress_line is None:
-                        with self._lock:
-                            if countdown < 0:
-                                countdown = frequency
-                                line = state.get_line(time.time())
+                    self._wakeup.clear()
+                    ts = time.time()
+                    if pending and state.is_due(ts):
+                        pending = False
+
+                    text = state.get_line(ts)
+                    if text is not None:
+                        line = text
 
-                            if line:
+                    if line:
+                        with self._lock:
+                            # Redraw when line changed, or was cleared; but not over a partially written line (until it's completed)
+                            shown = self._has_progress_line
+                            if self._thread and shown is not False and (line != self._current_line or shown is None):
                                 self._clear_line()
                                 self._write(line)
                                 self._write("\r")
                                 self._has_progress_line = True
+                                self._current_line = line
+
+                    # Deadline may be already passed (components refresh only once strictly past it), don't busy-loop meanwhile
+                    deadline = state.next_deadline(pending)
+                    if self._wakeup.wait(None if deadline is None else max(0.01, deadline - time.time())):
+                        pending = True
 
         finally:
             self.is_running = False
@@ -485,6 +561,7 @@ class LogSpec(Slotted):
     # See setup()'s docstring for meaning of each field
     __slots__ = (
         "appname",
+        "async_handlers",
         "basename",
         "console_format",
         "console_level",
@@ -497,8 +574,12 @@ class LogSpec(Slotted):
         "file_location",
         "locations",
         "project",
+        "rate_limit",
         "rotate",
+        "rotate_compress",
         "rotate_count",
+        "rotate_max_size",
+        "sample_debug",
         "timezone",
         "tmp",
     )
@@ -585,6 +666,216 @@ def is_writable_folder(path):
     return path and os.path.isdir(path) and os.access(path, os.W_OK)
 
 
+class _AsyncQueueHandler(QueueHandler):
+    """
+    Hands over log records to a bounded queue, serviced by a `_AsyncQueueListener` thread performing the actual I/O.
+
+    Backpressure policy (when queue is full):
+    - block: wait for room in the queue (no record is lost)
+    - drop: drop record
+    - drop-debug: drop DEBUG records as soon as the queue is 3/4 full, wait for room for more important records
+    """
+
+    policies = ("block", "drop", "drop-debug")
+
+    def __init__(self, policy, maxsize):
+        """
+        Args:
+            policy (str): Backpressure policy, one of `policies`
+            maxsize (int): Max number of records to queue
+        """
+        if policy not in self.policies:
+            raise ValueError("Invalid async backpressure policy '%s', expecting one of: %s" % (policy, ", ".join(self.policies)))
+
+        super().__init__(queue.Queue(maxsize=maxsize))
+        self.policy = policy
+        self.dropped = 0  # Number of records dropped so far, due to backpressure policy
+        self.debug_threshold = maxsize * 3 // 4 if maxsize > 0 else sys.maxsize
+
+    def prepare(self, record):
+        """
+        Unlike stdlib's QueueHandler, `exc_info` and `stack_info` are kept as-is (queue is in-process, no pickling needed),
+        so that formatters such as "json" can still render them separately from the message.
+        """
+        message = record.getMessage()
+        record = copy.copy(record)  # Don't affect other handlers in the chain
+        record.message = message
+        record.msg = message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        if self.policy == "drop":
+            try:
+                self.queue.put_nowait(record)
+
+            except queue.Full:
+                self.dropped += 1
+
+        elif self.policy == "block" or record.levelno > logging.DEBUG or self.queue.qsize() < self.debug_threshold:
+            self.queue.put(record)
+
+        else:
+            self.dropped += 1
+
+
+class _AsyncQueueListener(QueueListener):
+    def enqueue_sentinel(self):
+        self.queue.put(self._sentinel)  # Block instead of failing if queue is currently full
+
+
+class _OncePerRecordFilter(logging.Filter):
+    """Filter shared by several handlers, deciding only once per record (all handlers see the same verdict)"""
+
+    def __init__(self):
+        super().__init__()
+        self._seen = threading.local()
+
+    def filter(self, record):
+        seen = self._seen
+        if getattr(seen, "record", None) is not record:
+            seen.record = record
+            seen.verdict = self.verdict(record)
+
+        return seen.verdict
+
+    def verdict(self, record) -> bool:
+        """Should 'record' be logged?"""
+
+
+class _DebugSamplingFilter(_OncePerRecordFilter):
+    """Keeps only a random sample of DEBUG (and lower) records"""
+
+    def __init__(self, rate):
+        """
+        Args:
+            rate (float): Fraction of DEBUG records to keep, between 0 and 1
+        """
+        if not isinstance(rate, (int, float)) or not 0 <= rate <= 1:
+            raise ValueError("Invalid 'sample_debug' (expecting a number between 0 and 1): %s" % rate)
+
+        super().__init__()
+        self.rate = rate
+
+    def verdict(self, record):
+        return record.levelno > logging.DEBUG or random.random() < self.rate  # noqa: S311, not used for security
+
+
+class _RateLimitFilter(_OncePerRecordFilter):
+    """
+    Lets through at most `limit` records per `interval` seconds, per call site (logger name, line number and message template).
+    A "Suppressed N similar messages" summary is logged for call sites that went over their limit, once their interval elapses.
+
+    Expired call sites are checked when a record goes through the filter, and periodically via a `_RateLimitSweeper` heartbeat task
+    (so that call sites that went quiet get reported too). Pending summaries are flushed at exit, or when logging is re-configured.
+    """
+
+    def __init__(self, limit, interval):
+        """
+        Args:
+            limit (int): Max number of records per call site, per 'interval'
+            interval (float): Interval in seconds
+        """
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._sites = {}  # Call site -> [interval start, record count, suppressed count, level]
+        self._next_sweep = 0
+
+    @classmethod
+    def from_spec(cls, spec):
+        """
+        Args:
+            spec (str): Rate limit of the form "<count>/<duration>", example: "100/1m"
+
+        Returns:
+            (_RateLimitFilter): Corresponding filter
+        """
+        limit, _, interval = spec.partition("/")
+        limit = to_int(limit)
+        interval = to_seconds(interval)
+        if not limit or limit < 0 or not interval or interval < 0:
+            raise ValueError("Invalid 'rate_limit' (expecting <count>/<duration>, example: 100/1m): %s" % spec)
+
+        return cls(limit, interval)
+
+    def verdict(self, record):
+        if getattr(record, "rate_limit_summary", False):
+            return True
+
+        now = record.created
+        key = (record.name, record.lineno, str(record.msg))  # 'msg' can be any object, not necessarily hashable
+        with self._lock:
+            summaries = self._expired_sites(now) if now >= self._next_sweep else []
+            site = self._sites.get(key)
+            if site is not None and now - site[0] >= self.interval:
+                if site[2]:
+                    summaries.append((key, site))
+
+                site = None
+
+            if site is None:
+                site = self._sites[key] = [now, 0, 0, record.levelno]
+
+            site[1] += 1
+            allowed = site[1] <= self.limit
+            if not allowed:
+                site[2] += 1
+
+        self._log_summaries(summaries)
+        return allowed
+
+    def sweep(self):
+        """Forget expired call sites (if a sweep is due), logging summaries of the ones that had suppressed records"""
+        now = time.time()
+        with self._lock:
+            summaries = self._expired_sites(now) if now >= self._next_sweep else []
+
+        self._log_summaries(summaries)
+
+    def flush_summaries(self):
+        """Log summaries of all call sites that have pending suppressed records, regardless of whether their interval elapsed"""
+        with self._lock:
+            summaries = [(k, site) for k, site in self._sites.items() if site[2]]
+            self._sites = {}
+
+        self._log_summaries(summaries)
+
+    def _expired_sites(self, now):
+        """Remove expired call sites (caller holds `self._lock`), return the ones that had suppressed records"""
+        self._next_sweep = now + self.interval
+        summaries = []
+        for k, site in list(self._sites.items()):
+            if now - site[0] >= self.interval:
+                del self._sites[k]
+                if site[2]:
+                    summaries.append((k, site))
+
+        return summaries
+
+    @staticmethod
+    def _log_summaries(summaries):
+        for (name, _, msg), site in summaries:
+            msg = "Suppressed %s similar messages: %s" % (site[2], msg)
+            logging.getLogger(name).log(site[3], msg, extra={"rate_limit_summary": True})
+
+
+class _RateLimitSweeper(HeartbeatTask):
+    """Periodically reports call sites that went over their rate limit, even if they don't log anything anymore"""
+
+    def __init__(self, rate_limiter):
+        """
+        Args:
+            rate_limiter (_RateLimitFilter): Filter to sweep
+        """
+        super().__init__(frequency=1)  # Cheap when no sweep is due, short frequency keeps summaries timely
+        self.rate_limiter = rate_limiter
+
+    def execute(self):
+        self.rate_limiter.sweep()
+
+
 class _ContextFilter(logging.Filter):
     """
     Optional logging filter allowing to inject key/value pairs to every log record.
@@ -592,6 +883,7 @@ class _ContextFilter(logging.Filter):
     In order to activate this:
     - Mention %(context)s in your log format
     - Add key/value pairs via runez.log.context.add_global(), runez.log.context.add_threadlocal()
+    - Or, for asyncio tasks: `with runez.log.context.task_scope(key=value): ...`
     """
 
     def __init__(self, context, name=""):
@@ -602,32 +894,142 @@ class _ContextFilter(logging.Filter):
         """
         super().__init__(name=name)
         self.context = context
+        self._cache = threading.local()
 
     def filter(self, record):
         """Determines if the record should be logged and injects context info into the record. Always returns True"""
         fmt = LogManager.spec.context_format
         if fmt:
-            data = self.context.to_dict()
-            if data:
-                record.context = fmt % ",".join("%s=%s" % (key, val) for key, val in sorted(data.items()) if key and val)
-
-            else:
-                record.context = ""
+            # Rendered context is cached per thread, and recomputed only when context was modified (or 'fmt' or task scope changed)
+            cache = self._cache
+            version = self.context.version
+            task = self.context._task_payload.get()
+            if getattr(cache, "version", None) != version or cache.fmt is not fmt or cache.task is not task:
+                cache.version = version
+                cache.fmt = fmt
+                cache.task = task
+                cache.data = self.context.to_dict()
+                if cache.data:
+                    cache.rendered = fmt % ",".join("%s=%s" % (key, val) for key, val in sorted(cache.data.items()) if key and val)
+
+                else:
+                    cache.rendered = ""
+
+            record.context = cache.rendered
+            record.context_data = cache.data
 
         return True
 
 
+class _JsonFormatter(logging.Formatter):
+    """Emits one JSON object per log record, used when format "json" is specified"""
+
+    # Equivalent %-format, used to determine which record fields need to be computed (see LogManager._is_using_format())
+    equivalent_format = "%(asctime)s %(levelname)s %(name)s %(message)s %(context)s"
+
+    def __init__(self):
+        super().__init__()
+        self._fmt = "json"
+        self._encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str).encode
+        self._last_second = None
+        self._last_stamp = None
+
+    def formatTime(self, record, datefmt=None):
+        """ISO 8601 timestamp, with milliseconds and time zone offset (seconds part is computed at most once per second)"""
+        if datefmt:
+            return super().formatTime(record, datefmt=datefmt)
+
+        second = int(record.created)
+        if second != self._last_second:
+            self._last_stamp = time.strftime("%Y-%m-%dT%H:%M:%S.{}%z", self.converter(second))
+            self._last_second = second
+
+        return self._last_stamp.format("%03d" % record.msecs)
+
+    def format(self, record):
+        result = {
+            "timestamp": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        context = getattr(record, "context_data", None)
+        if context:
+            result["context"] = context
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+
+        if record.exc_text:
+            result["exc_info"] = record.exc_text
+
+        if record.stack_info:
+            result["stack_info"] = self.formatStack(record.stack_info)
+
+        return self._encode(result)
+
+
+class _TimeitStats:
+    """Aggregated timings of one function, with a log-scale histogram (~9% precision) allowing to estimate percentiles"""
+
+    __slots__ = ("buckets", "count", "max_ns", "min_ns", "total_ns")
+
+    buckets_per_octave = 8
+
+    def __init__(self):
+        self.buckets = {}  # Bucket number -> count
+        self.count = 0
+        self.max_ns = 0
+        self.min_ns = 0
+        self.total_ns = 0
+
+    def add(self, elapsed_ns):
+        bucket = int(math.log2(elapsed_ns) * self.buckets_per_octave) if elapsed_ns > 0 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        if not self.count or elapsed_ns < self.min_ns:
+            self.min_ns = elapsed_ns
+
+        self.max_ns = max(self.max_ns, elapsed_ns)
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+    def percentile(self, p):
+        """
+        Args:
+            p (int | float): Percentile to estimate (between 0 and 100)
+
+        Returns:
+            (int): Estimated 'p'-th percentile, in nanoseconds
+        """
+        threshold = self.count * p / 100
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= threshold:
+                upper = int(2 ** ((bucket + 1) / self.buckets_per_octave))
+                return max(self.min_ns, min(self.max_ns, upper))
+
+        return self.max_ns
+
+
 class Timeit:
-    """Measure how long a decorated function, or context, took to run"""
+    """Measure how long a decorated function, or context, took to run
+
+    With `aggregate=True`, individual calls are not logged, timings are aggregated per function name instead (see `report()`)
+    """
 
     function_name: str | None = None
 
-    def __init__(self, function=None, color: OptionalColor = "bold", logger=UNSET, fmt="{function} took {elapsed}"):
+    _stats: ClassVar[dict[str, _TimeitStats]] = {}
+    _stats_lock = threading.Lock()
+
+    def __init__(self, function=None, color: OptionalColor = "bold", logger=UNSET, fmt="{function} took {elapsed}", aggregate=False):
         self.__func__ = None
         self.start_time: float = 0
         self.color = color
         self.logger = logger
         self.fmt = fmt
+        self.aggregate = aggregate
         if callable(function):
             # We're being used as a decorator without args
             self.__func__ = function
@@ -648,6 +1050,14 @@ class Timeit:
             (callable): Decorated function
         """
         if self.__func__:
+            if self.aggregate:
+                start = time.perf_counter_ns()
+                try:
+                    return self.__func__(*args, **kwargs)
+
+                finally:
+                    self.record(self.function_name, time.perf_counter_ns() - start)
+
             with self:
                 return self.__func__(*args, **kwargs)
 
@@ -659,7 +1069,7 @@ class Timeit:
         return self
 
     def __enter__(self):
-        self.start_time = time.time()
+        self.start_time = time.perf_counter_ns() if self.aggregate else time.time()
         return self
 
     def __exit__(self, exc_type, exc_value, exc_traceback):
@@ -667,6 +1077,10 @@ class Timeit:
         if not msg:
             msg = "%s()" % find_caller()
 
+        if self.aggregate:
+            self.record(msg, time.perf_counter_ns() - self.start_time)
+            return
+
         logger = _R.rdefault(self.logger, LogManager.spec.default_logger)
         if callable(logger):
             elapsed = time.time() - self.start_time
@@ -685,6 +1099,130 @@ class Timeit:
 
             logger(msg)
 
+    @classmethod
+    def record(cls, name, elapsed_ns):
+        """
+        Args:
+            name (str): Name of function (or code section) that was timed
+            elapsed_ns (int): How long it took, in nanoseconds
+        """
+        with cls._stats_lock:
+            stats = cls._stats.get(name)
+            if stats is None:
+                stats = cls._stats[name] = _TimeitStats()
+
+            stats.add(elapsed_ns)
+
+    @classmethod
+    def report(cls, reset=False, border=None):
+        """
+        Args:
+            reset (bool): If True, clear aggregated timings after report is rendered
+            border (str | None): Border to use for rendered table
+
+        Returns:
+            (runez.render.PrettyTable | None): Table of aggregated timings (most time-consuming first), if any
+        """
+        with cls._stats_lock:
+            stats = sorted(cls._stats.items(), key=lambda x: (-x[1].total_ns, x[0]))
+            if reset:
+                cls._stats = {}
+
+        if stats:
+            from runez.render import PrettyTable
+
+            table = PrettyTable("Function,Calls,Total,Mean,Min,p50,p95,p99,Max", border=border)
+            for i in range(1, 9):
+                table.header[i].align = "right"
+
+            for name, s in stats:
+                durations = (s.total_ns, s.total_ns // s.count, s.min_ns, s.percentile(50), s.percentile(95), s.percentile(99), s.max_ns)
+                table.add_row(name, s.count, *(represented_duration(x / 1e9, span=-2) for x in durations))
+
+            return table
+
+    @classmethod
+    def report_on(cls, at_exit=True, signum=None, logger=UNSET, reset=False):
+        """Log aggregated timings report at exit, and/or when signal 'signum' is received
+
+        Args:
+            at_exit (bool): If True, log report at exit
+            signum (int | None): Signal number to log report on (example: signal.SIGUSR2)
+            logger (callable | None): Logger to use (default: LogManager.spec.default_logger)
+            reset (bool): If True, clear aggregated timings each time report is logged
+        """
+
+        def log_report():
+            table = cls.report(reset=reset)
+            if table is not None:
+                _R.hlog(logger, "Timings:\n%s" % table)
+
+        def on_signal(*_):
+            # Signal handler may interrupt a thread holding `_stats_lock` (or a logging lock): report from a separate thread
+            threading.Thread(target=log_report, name="runez-timings-report", daemon=True).start()
+
+        if at_exit:
+            atexit.register(log_report)
+
+        if signum:
+            signal.signal(signum, on_signal)
+
+
+class _SamplingProfiler(threading.Thread):
+    """Samples stacks of all other threads at a fixed rate, and writes them in collapsed-stack format once done"""
+
+    def __init__(self, path, duration, rate):
+        """
+        Args:
+            path (str): Path to file where to write collapsed stacks
+            duration (int | float): How long to sample for, in seconds
+            rate (int | float): How many samples to take per second
+        """
+        super().__init__(name="runez-sampling-profiler", daemon=True)
+        self.path = path
+        self.duration = duration
+        self.interval = 1.0 / rate
+        self.samples = {}  # Collapsed stack -> number of times it was seen
+        self._cancelled = threading.Event()
+
+    def cancel(self):
+        """Stop sampling, without writing collapsed stacks to `path`"""
+        self._cancelled.set()
+        if self.is_alive() and self is not threading.current_thread():
+            self.join()
+
+    def run(self):
+        end = time.monotonic() + self.duration
+        while True:
+            self.take_sample()
+            now = time.monotonic()
+            if now >= end:
+                break
+
+            if self._cancelled.wait(min(self.interval, end - now)):
+                return
+
+        with open(self.path, "w") as fh:
+            fh.writelines("%s %s\n" % (stack, count) for stack, count in sorted(self.samples.items()))
+
+        _R.hlog(UNSET, "Sampling profile written to %s" % self.path)
+
+    def take_sample(self):
+        """Record current stack of all threads (except this one)"""
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident != self.ident:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    name = getattr(code, "co_qualname", code.co_name)
+                    stack.append("%s:%s" % (os.path.basename(code.co_filename), name))
+                    frame = frame.f_back
+
+                stack.append(names.get(ident, "thread-%s" % ident))
+                stack = ";".join(reversed(stack))
+                self.samples[stack] = self.samples.get(stack, 0) + 1
+
 
 class LogManager:
     """
@@ -696,6 +1234,7 @@ class LogManager:
     # Use runez.log.override_spec() to change these defaults (do not change directly)
     _default_spec = LogSpec(
         appname=None,
+        async_handlers=False,
         basename="{appname}.log",
         console_format="%(levelname)s %(message)s",
         console_level=logging.WARNING,
@@ -708,8 +1247,12 @@ class LogManager:
         file_level=logging.DEBUG,
         file_location=None,
         locations=("{dev}/log/{basename}", "/logs/{appname}/{basename}", "/var/log/{basename}"),
+        rate_limit=None,
         rotate=None,
+        rotate_compress=None,
         rotate_count=10,
+        rotate_max_size=None,
+        sample_debug=None,
         timezone=local_timezone(),
         tmp=None,
     )
@@ -733,15 +1276,25 @@ class LogManager:
     console_handler: logging.StreamHandler | None = None
     file_handler: logging.FileHandler | None = None  # File we're currently logging to (if any)
     handlers: list[logging.Handler] | None = None
+    async_handler: _AsyncQueueHandler | None = None  # Queue handler on root logger, when `async_handlers` is enabled
+    async_queue_size = 10000
     tracer: Traceable | None = None
     used_formats: str | None = None
     faulthandler_signum: int | None = None
+    profiler_signum: int | None = None
     trace_env_var = "TRACE_DEBUG"
 
     # Convenience decorator/context logging how long a function or section of code took to run
     timeit = Timeit
 
     _lock = threading.RLock()
+    _async_atexit = False
+    _profiler: _SamplingProfiler | None = None
+    _profiler_previous_handler = None  # Signal handler that was in place before `enable_sampling_profiler()`
+    _async_listener: _AsyncQueueListener | None = None
+    _log_filters: tuple[logging.Filter, ...] = ()
+    _log_filters_atexit = False
+    _rate_limit_sweeper: _RateLimitSweeper | None = None
     _logging_snapshot = LoggingSnapshot()
     _progress_handler: ProgressHandler | None = None
 
@@ -774,6 +1327,7 @@ class LogManager:
         clean_handlers=UNSET,
         greetings=UNSET,
         appname=UNSET,
+        async_handlers=UNSET,
         basename=UNSET,
         console_format=UNSET,
         console_level=UNSET,
@@ -785,8 +1339,12 @@ class LogManager:
         file_level=UNSET,
         file_location=UNSET,
         locations=UNSET,
+        rate_limit=UNSET,
         rotate=UNSET,
+        rotate_compress=UNSET,
         rotate_count=UNSET,
+        rotate_max_size=UNSET,
+        sample_debug=UNSET,
         timezone=UNSET,
         tmp=UNSET,
         trace=UNSET,
@@ -800,19 +1358,26 @@ class LogManager:
             clean_handlers (bool): Remove any existing logging.root.handlers
             greetings (str | None): Optional greetings message(s) to log
             appname (str | None): Program's base name, not used directly, just as reference for default 'basename'
+            async_handlers (bool | str | None): Perform console/file I/O in a background thread, fed via a bounded queue
+                Use a string to specify backpressure policy when queue is full: "block" (default), "drop" or "drop-debug"
             basename (str | None): Base name of target log file, not used directly, just as reference for default 'locations'
-            console_format (str | None): Format to use for console log, use None to deactivate
+            console_format (str | None): Format to use for console log ("json": one JSON object per record), use None to deactivate
             console_level (int | None): Level to use for console logging
             console_stream (io.TextIOBase | TextIO | None): Stream to use for console log (eg: sys.stderr), use None to deactivate
             context_format (str | None): Format to use for contextual log, use None to deactivate
             default_logger (callable | None): Default logger to use to trace operations such as runez.run() etc
             dev (str | None): Custom folder to use when running from a development venv (auto-determined if None)
-            file_format (str | None): Format to use for file log, use None to deactivate
+            file_format (str | None): Format to use for file log ("json": one JSON object per record), use None to deactivate
             file_level (int | None): Level to use for file logging
             file_location (str | None): Desired custom file location (overrides {locations} search, handy as a --log cli flag)
             locations (list[str]|None): List of candidate folders for file logging (None: deactivate file logging)
+            rate_limit (str | None): Max records per call site, example: "100/1m" (similar messages beyond that are suppressed)
             rotate (str | None): How to rotate log file (None: no rotation, "time:1d" time-based, "size:50m" size-based)
+                Use "time:1d+size:50m" to rotate on whichever comes first
+            rotate_compress (str | None): Compress rotated files in a background thread ("gz", "bz2", "xz" or "zst")
             rotate_count (int): How many rotations to keep
+            rotate_max_size (str | int | None): Max total size of rotated files to keep, example: "1g"
+            sample_debug (float | None): Fraction of DEBUG records to keep (randomly sampled), example: 0.1 to keep 10%
             timezone (str | None): Time zone, use None to deactivate time zone logging
             tmp (str | None): Optional temp folder to use (auto determined)
             trace (str | bool): Env var to enable tracing, example: "DEBUG+| " to trace when $DEBUG defined (+ [optional] "| " as prefix)
@@ -823,6 +1388,7 @@ class LogManager:
             cls.set_dryrun(dryrun)
             cls.spec.set(
                 appname=appname,
+                async_handlers=async_handlers,
                 basename=basename,
                 console_format=console_format,
                 console_level=console_level or level,
@@ -834,8 +1400,12 @@ class LogManager:
                 file_level=file_level or level,
                 file_location=file_location,
                 locations=locations,
+                rate_limit=rate_limit,
                 rotate=rotate,
+                rotate_compress=rotate_compress,
                 rotate_count=rotate_count,
+                rotate_max_size=rotate_max_size,
+                sample_debug=sample_debug,
                 timezone=timezone,
                 tmp=tmp,
             )
@@ -872,6 +1442,8 @@ class LogManager:
 
             cls._setup_console_handler()
             cls._setup_file_handler()
+            cls._setup_async_handler()
+            cls._setup_log_filters()
             cls._auto_enable_progress_handler()
             cls._update_used_formats()
             cls._fix_logging_shortcuts()
@@ -911,19 +1483,24 @@ class LogManager:
     def clean_handlers(cls):
         """Remove all non-runez logging handlers"""
         for h in list(logging.root.handlers):
-            if h is not cls.console_handler and h is not cls.file_handler and h is not cls._progress_handler:
+            if h not in (cls.console_handler, cls.file_handler, cls.async_handler, cls._progress_handler):
                 logging.root.removeHandler(h)
 
     @classmethod
     def reset(cls):
         """Reset logging as it was before setup(), no need to call this outside of testing, or some very special cases"""
         cls._disable_faulthandler()
+        cls._disable_sampling_profiler()
+        cls._flush_log_filters()
+        cls._stop_rate_limit_sweeper()
+        cls._stop_async_listener()
         if cls.handlers is not None:
             for handler in cls.handlers:
                 logging.root.removeHandler(handler)
 
             cls.handlers = None
 
+        cls._log_filters = ()
         cls._logging_snapshot.restore()
         cls.context.reset()
         cls.spec = LogSpec(cls._default_spec)
@@ -934,6 +1511,16 @@ class LogManager:
         cls.tracer = None
         cls.used_formats = None
 
+    @classmethod
+    def flush(cls):
+        """Wait for all queued log records (if `async_handlers` is enabled) to be emitted, and flush all handlers"""
+        listener = cls._async_listener
+        if listener is not None and listener._thread is not None:
+            listener.queue.join()
+
+        for handler in cls.handlers or ():
+            handler.flush()
+
     @classmethod
     def silence(cls, *modules, level=logging.WARNING):
         """
@@ -971,6 +1558,38 @@ class LogManager:
                 faulthandler.enable(file=dump_file, all_threads=True)
                 faulthandler.register(signum, file=dump_file, all_threads=True, chain=False)
 
+    @classmethod
+    def enable_sampling_profiler(cls, signum=UNSET, duration=30, rate=100):
+        """Enable sampling all threads' stacks for `duration` seconds when specified signal is received.
+        Samples are written in collapsed-stack format (usable with flamegraph tools), next to current log file.
+
+        Args:
+            signum (int | None): Signal number triggering profiling (use None to disable)
+            duration (int | float): How long to sample for, in seconds
+            rate (int | float): How many samples to take per second
+        """
+        if signum is UNSET:
+            signum = getattr(signal, "SIGUSR2", None)
+
+        with cls._lock:
+            if not signum:
+                cls._disable_sampling_profiler()
+                return
+
+            if not cls.file_handler:
+                return
+
+            def start_profiler(*_):
+                if cls._profiler is None or not cls._profiler.is_alive():
+                    stamp = time.strftime("%Y%m%d-%H%M%S")
+                    path = "%s.%s.%s.collapsed" % (os.path.splitext(cls.file_handler.baseFilename)[0], os.getpid(), stamp)
+                    cls._profiler = _SamplingProfiler(path, duration, rate)
+                    cls._profiler.start()
+
+            cls._disable_sampling_profiler()  # Restore previous handler if we were already enabled (possibly on another signal)
+            cls.profiler_signum = signum
+            cls._profiler_previous_handler = signal.signal(signum, start_profiler)
+
     @classmethod
     def override_spec(cls, **settings):
         """Override 'spec' and '_default_spec' with given values"""
@@ -1014,12 +1633,15 @@ class LogManager:
         """
         Args:
             message (str): Message to trace
+            *args: Arguments for 'message', formatted only if tracing is active
         """
-        if cls.tracer or cls.progress.is_running:
-            message = formatted(message, *args)
-            cls.progress._show_debug(message)
-            if cls.tracer:
-                cls.tracer.trace(message)
+        if cls.tracer is None and not cls.progress.is_running:
+            return  # Fast path: tracing disabled, 'message' is not formatted
+
+        message = formatted(message, *args)
+        cls.progress._show_debug(message)
+        if cls.tracer is not None:
+            cls.tracer.trace(message)
 
     @classmethod
     def hdry(cls, message, dryrun=UNSET, logger=UNSET):
@@ -1082,6 +1704,9 @@ class LogManager:
         cls.used_formats = None
         for handler in (cls.console_handler, cls.file_handler):
             fmt = _get_fmt(handler)
+            if fmt == "json":
+                fmt = _JsonFormatter.equivalent_format
+
             if fmt:
                 cls.used_formats = "%s %s" % (cls.used_formats or "", fmt)
                 cls.used_formats = cls.used_formats.strip()
@@ -1112,22 +1737,108 @@ class LogManager:
                 logging.root.removeHandler(existing)
 
             if target:
-                cls.file_handler = cls._add_handler(_get_file_handler(target, cls.spec.rotate, cls.spec.rotate_count), fmt, level)
+                handler = _get_file_handler(
+                    target,
+                    cls.spec.rotate,
+                    cls.spec.rotate_count,
+                    compress=cls.spec.rotate_compress,
+                    max_size=cls.spec.rotate_max_size,
+                )
+                cls.file_handler = cls._add_handler(handler, fmt, level)
 
     @classmethod
     def _add_handler(cls, new_handler, fmt, level):
         if fmt:
-            new_handler.setFormatter(logging.Formatter(fmt))
+            new_handler.setFormatter(_JsonFormatter() if fmt == "json" else logging.Formatter(fmt))
 
         if level:
             new_handler.setLevel(level)
 
-        logging.root.addHandler(new_handler)
+        if cls.async_handler is None:
+            logging.root.addHandler(new_handler)
+
         if cls.handlers is not None:
             cls.handlers.append(new_handler)
 
         return new_handler
 
+    @classmethod
+    def _setup_async_handler(cls):
+        cls._stop_async_listener()
+        policy = cls.spec.async_handlers
+        if policy and cls.handlers:
+            if policy is True:
+                policy = "block"
+
+            cls.async_handler = _AsyncQueueHandler(policy, cls.async_queue_size)
+            for handler in cls.handlers:
+                logging.root.removeHandler(handler)
+
+            logging.root.addHandler(cls.async_handler)
+            cls._async_listener = _AsyncQueueListener(cls.async_handler.queue, *cls.handlers, respect_handler_level=True)
+            cls._async_listener.start()
+            if not cls._async_atexit:
+                cls._async_atexit = True
+                atexit.register(cls._stop_async_listener)
+
+    @classmethod
+    def _setup_log_filters(cls):
+        """Install rate limiting and sampling filters, as per spec (on queue handler in async mode, to filter out at the source)"""
+        cls._flush_log_filters()
+        cls._stop_rate_limit_sweeper()
+        for handler in (cls.async_handler, *(cls.handlers or ())):
+            if handler is not None:
+                for log_filter in cls._log_filters:
+                    handler.removeFilter(log_filter)
+
+        log_filters = []
+        if cls.spec.sample_debug is not None:
+            log_filters.append(_DebugSamplingFilter(cls.spec.sample_debug))
+
+        if cls.spec.rate_limit:
+            rate_limiter = _RateLimitFilter.from_spec(cls.spec.rate_limit)
+            log_filters.append(rate_limiter)
+            cls._rate_limit_sweeper = _RateLimitSweeper(rate_limiter)
+            Heartbeat.add_task(cls._rate_limit_sweeper)
+            Heartbeat.start()
+            if not cls._log_filters_atexit:
+                cls._log_filters_atexit = True
+                atexit.register(cls._flush_log_filters)
+
+        cls._log_filters = tuple(log_filters)
+        for handler in (cls.async_handler,) if cls.async_handler else cls.handlers or ():
+            for log_filter in cls._log_filters:
+                handler.addFilter(log_filter)
+
+    @classmethod
+    def _flush_log_filters(cls):
+        """Emit pending summaries of currently installed rate limiting filter, if any"""
+        for log_filter in cls._log_filters:
+            if isinstance(log_filter, _RateLimitFilter):
+                log_filter.flush_summaries()
+
+    @classmethod
+    def _stop_rate_limit_sweeper(cls):
+        if cls._rate_limit_sweeper is not None:
+            Heartbeat.remove_task(cls._rate_limit_sweeper)
+            cls._rate_limit_sweeper = None
+
+    @classmethod
+    def _stop_async_listener(cls):
+        """Emit all pending queued records, and revert to synchronous logging"""
+        with cls._lock:
+            listener = cls._async_listener
+            if listener is not None:
+                cls._async_listener = None
+                if listener._thread is not None:
+                    listener.stop()
+
+            if cls.async_handler is not None:
+                logging.root.removeHandler(cls.async_handler)
+                cls.async_handler = None
+                for handler in cls.handlers or ():
+                    logging.root.addHandler(handler)
+
     @classmethod
     def _auto_fill_defaults(cls):
         """Late autofilled missing defaults (caller's value kept if provided)"""
@@ -1147,6 +1858,20 @@ class LogManager:
             faulthandler.disable()
             cls.faulthandler_signum = None
 
+    @classmethod
+    def _disable_sampling_profiler(cls):
+        if cls.profiler_signum:
+            # Restore handler that was in place before we enabled the profiler (None: it wasn't installed from python)
+            previous = cls._profiler_previous_handler
+            signal.signal(cls.profiler_signum, signal.SIG_DFL if previous is None else previous)
+            cls.profiler_signum = None
+            cls._profiler_previous_handler = None
+
+        profiler = cls._profiler
+        if profiler is not None:
+            cls._profiler = None
+            profiler.cancel()  # Don't write a profile after profiler was disabled
+
     @classmethod
     def _fix_logging_shortcuts(cls):
         """
@@ -1167,17 +1892,21 @@ class LogManager:
             LOG = logging.getLogger(__name__)
             LOG.info("hello")
         """
-        if cls._is_using_format("context"):
+        use_context = cls._is_using_format("context")
+        if use_context:
             cls.context.enable(True)
-            if cls.context.filter is not None and cls.handlers is not None:
-                for handler in cls.handlers:
+
+        if cls.context.filter is not None:
+            # Thread-local context must be rendered on caller's thread, ie: by the queue handler when in async mode
+            targets = () if not use_context else (cls.async_handler,) if cls.async_handler else cls.handlers or ()
+            for handler in (cls.async_handler, *(cls.handlers or ())):
+                if handler in targets:
                     handler.addFilter(cls.context.filter)
 
-        else:
-            if cls.context.filter is not None and cls.handlers is not None:
-                for handler in cls.handlers:
+                elif handler is not None:
                     handler.removeFilter(cls.context.filter)
 
+        if not use_context:
             cls.context.enable(False)
 
         if cls._is_using_format("pathname", "filename", "funcName", "module"):
@@ -1321,7 +2050,7 @@ def _get_fmt(handler):
     return handler and handler.formatter and handler.formatter._fmt
 
 
-def _get_file_handler(location, rotate, rotate_count):
+def _get_file_handler(location, rotate, rotate_count, compress=None, max_size=None):
     """
     Args:
         location (str | None): Log file path
@@ -1332,7 +2061,10 @@ def _get_file_handler(location, rotate, rotate_count):
             time:7d - Rotate every 7 days
             size:20m - Rotate every 20MB
             size:1g - Rotate every 1MB
+            time:1d+size:50m - Rotate every day, or every 50MB (whichever comes first)
         rotate_count (int): How many backups to keep
+        compress (str | None): Compress rotated files in a background thread ("gz", "bz2", "xz" or "zst")
+        max_size (str | int | None): Max total size of backups to keep
 
     Returns:
         (logging.FileHandler): Associated handler
@@ -1340,33 +2072,215 @@ def _get_file_handler(location, rotate, rotate_count):
     if not rotate:
         return logging.FileHandler(location)
 
-    kind, _, mode = rotate.partition(":")
+    when = interval = max_bytes = None
+    for part in rotate.split("+"):
+        kind, _, mode = part.partition(":")
+        if not mode:
+            raise ValueError("Invalid 'rotate' (missing kind): %s" % rotate)
+
+        if kind == "time":
+            if mode == "midnight":
+                when = mode
+                continue
+
+            timed = "shd"
+            if mode[-1].lower() not in timed:
+                raise ValueError("Invalid 'rotate' (unknown time spec): %s" % rotate)
 
-    if not mode:
-        raise ValueError("Invalid 'rotate' (missing kind): %s" % rotate)
+            interval = to_int(mode[:-1])
+            if interval is None:
+                raise ValueError("Invalid 'rotate' (time range not an int): %s" % rotate)
 
-    if kind == "time":
-        if mode == "midnight":
-            return TimedRotatingFileHandler(location, when="midnight", backupCount=rotate_count)
+            when = mode[-1]
 
-        timed = "shd"
-        if mode[-1].lower() not in timed:
-            raise ValueError("Invalid 'rotate' (unknown time spec): %s" % rotate)
+        elif kind == "size":
+            max_bytes = to_bytesize(mode)
+            if max_bytes is None:
+                raise ValueError("Invalid 'rotate' (size not a bytesize): %s" % rotate)
 
-        interval = to_int(mode[:-1])
-        if interval is None:
-            raise ValueError("Invalid 'rotate' (time range not an int): %s" % rotate)
+        else:
+            raise ValueError("Invalid 'rotate' (unknown type): %s" % rotate)
+
+    if compress or max_size or (when and max_bytes):
+        return _CompressingRotatingFileHandler(location, when, interval, max_bytes, rotate_count, compress, max_size)
+
+    if max_bytes:
+        return RotatingFileHandler(location, maxBytes=max_bytes, backupCount=rotate_count)
+
+    if when == "midnight":
+        return TimedRotatingFileHandler(location, when="midnight", backupCount=rotate_count)
+
+    return TimedRotatingFileHandler(location, when=when, interval=interval, backupCount=rotate_count)
+
+
+class _CompressingRotatingFileHandler(BaseRotatingHandler):
+    """
+    Rotates log file based on time and/or size.
+    Rotated files are named after the time they were rotated at, compressed and groomed in a background thread.
+    """
+
+    compressions = ("bz2", "gz", "xz", "zst")
+
+    def __init__(self, filename, when, interval, max_bytes, backup_count, compress, max_size):
+        """
+        Args:
+            filename (str): Path to log file
+            when (str | None): "midnight", or unit of 'interval' ("s", "h" or "d"), None for no time-based rotation
+            interval (int | None): Rotate every 'interval' units of time
+            max_bytes (int | None): Rotate when file reaches this size (None for no size-based rotation)
+            backup_count (int): Max number of backups to keep (0: no limit)
+            compress (str | None): Compression to use for rotated files
+            max_size (str | int | None): Max total size of backups to keep
+        """
+        if compress not in (None, *self.compressions):
+            raise ValueError("Invalid 'rotate_compress' (expecting one of %s): %s" % (", ".join(self.compressions), compress))
+
+        if compress == "zst" and not _zstandard_module() and not _external_compressor(compress):
+            raise ValueError("Invalid 'rotate_compress' (requires 'zstandard' module or 'zstd' program): %s" % compress)
+
+        total_size = to_bytesize(max_size) if max_size else None
+        if max_size and not total_size:
+            raise ValueError("Invalid 'rotate_max_size' (not a bytesize): %s" % max_size)
+
+        super().__init__(filename, "a")
+        self.when = when and when.lower()
+        self.interval = interval and interval * {"s": 1, "h": 3600, "d": 86400}.get(self.when, 1)
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.max_size = total_size
+        self.rollover_at = None
+        self._executor = None
+        self._last_stamp = None
+        self._stamp_counter = 0
+        self._rx_backup = re.compile(
+            r"^%s\.(\d{8}-\d{6})(?:-(\d+))?(?:\.(?:%s))?$" % (re.escape(os.path.basename(filename)), "|".join(self.compressions))
+        )
+        if self.when:
+            start = os.stat(filename).st_mtime if os.path.exists(filename) else time.time()
+            self.rollover_at = self._next_rollover(start)
+
+    def _next_rollover(self, now):
+        if self.when == "midnight":
+            t = time.localtime(now)
+            return time.mktime((t.tm_year, t.tm_mon, t.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+
+        return now + self.interval
+
+    def shouldRollover(self, record):
+        if self.rollover_at is not None and record.created >= self.rollover_at:
+            return True
+
+        if self.max_bytes:
+            if self.stream is None:
+                self.stream = self._open()
+
+            position = self.stream.tell()
+            if position and position + len(self.format(record)) + 1 >= self.max_bytes:
+                return True
+
+        return False
+
+    def doRollover(self):
+        if self.stream:
+            self.stream.close()
+            self.stream = None
+
+        now = time.time()
+        if os.path.exists(self.baseFilename):
+            stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+            if stamp == self._last_stamp:
+                self._stamp_counter += 1  # Several rotations within the same second
+
+            else:
+                self._last_stamp = stamp
+                self._stamp_counter = 0
 
-        return TimedRotatingFileHandler(location, when=mode[-1], interval=interval, backupCount=rotate_count)
+            while True:
+                backup = "%s.%s" % (self.baseFilename, stamp)
+                if self._stamp_counter:
+                    backup += "-%s" % self._stamp_counter
+
+                if not any(os.path.exists(path) for path in (backup, "%s.%s" % (backup, self.compress))):
+                    break
+
+                self._stamp_counter += 1
+
+            os.rename(self.baseFilename, backup)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="runez-log-rotation")
+
+            self._executor.submit(self._groom, backup)
+
+        self.stream = self._open()
+        if self.when:
+            self.rollover_at = self._next_rollover(now)
+
+    def close(self):
+        super().close()
+        executor = self._executor
+        if executor is not None:
+            self._executor = None
+            executor.shutdown(wait=True)  # Finish compressing rotated files
+
+    def backups(self):
+        """
+        Returns:
+            (list[str]): Paths to rotated files, most recent first
+        """
+        backups = []
+        folder = os.path.dirname(self.baseFilename)
+        for name in os.listdir(folder):
+            m = self._rx_backup.match(name)
+            if m:
+                backups.append((m.group(1), int(m.group(2) or 0), os.path.join(folder, name)))
+
+        return [x[2] for x in sorted(backups, reverse=True)]
+
+    def _groom(self, backup):
+        """Compress 'backup' (if configured), and delete older backups as per retention settings. Runs in a background thread"""
+        try:
+            if self.compress:
+                _compressed_log_file(backup, self.compress)
+
+            if self.backup_count or self.max_size:
+                total_size = 0
+                for i, path in enumerate(self.backups()):
+                    total_size += os.path.getsize(path)
+                    if (self.backup_count and i >= self.backup_count) or (self.max_size and total_size > self.max_size):
+                        os.remove(path)
+
+        except Exception:
+            # Reported like `logging.Handler.handleError()` does (no one is waiting on the background thread's outcome)
+            if logging.raiseExceptions and sys.stderr:
+                sys.stderr.write("--- Logging error while grooming rotated log file %s ---\n" % backup)
+                traceback.print_exc(file=sys.stderr)
+
+
+def _compressed_log_file(path, ext):
+    """Compress file 'path' to 'path.ext' (deleting 'path' once done)"""
+    target = "%s.%s" % (path, ext)
+    tmp = "%s.tmp" % target
+    if ext == "zst":
+        zstandard = _zstandard_module()
+        if zstandard:
+            with open(path, "rb") as fin, open(tmp, "wb") as fout:
+                zstandard.ZstdCompressor().copy_stream(fin, fout)
+
+        else:
+            _run_external_compressor(ext, path, tmp)
 
-    if kind == "size":
-        size = to_bytesize(mode)
-        if size is None:
-            raise ValueError("Invalid 'rotate' (size not a bytesize): %s" % rotate)
+    else:
+        import bz2
+        import gzip
+        import lzma
 
-        return RotatingFileHandler(location, maxBytes=size, backupCount=rotate_count)
+        opener = {"bz2": bz2.open, "gz": gzip.open, "xz": lzma.open}[ext]
+        with open(path, "rb") as fin, opener(tmp, "wb") as fout:
+            shutil.copyfileobj(fin, fout)
 
-    raise ValueError("Invalid 'rotate' (unknown type): %s" % rotate)
+    os.replace(tmp, target)
+    os.remove(path)
 
 
 class _WrappedInstanceFunction:
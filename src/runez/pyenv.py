@@ -1,8 +1,17 @@
 from __future__ import annotations
 
+import atexit
+import bisect
+import codecs
+import contextlib
+import functools
 import json
+import math
 import os
 import re
+import threading
+import time
+from html.parser import HTMLParser
 from pathlib import Path
 from typing import ClassVar
 
@@ -12,11 +21,26 @@ from runez.system import _R, cached_property, flattened, joined, ltattr, Optiona
 
 CPYTHON = "cpython"
 RX_PYTHON_BASENAME = re.compile(r"^python(\d(\.\d+)?)?(t?)$")
+RX_PYTHON_VERSION_NAME = re.compile(r"^(python)?\d+\.\d+(\.\d+)?((a|b|rc)\d+)?(-dev)?t?$")  # Eg: 3.12.1, 3.12-dev, python3.12
 
 
 class ArtifactInfo:
     """Info extracted from a typical python build artifact basename"""
 
+    __slots__ = (
+        "basename",
+        "hashes",
+        "is_wheel",
+        "last_modified",
+        "package_name",
+        "pypi_name",
+        "size",
+        "source",
+        "tags",
+        "version",
+        "wheel_build_number",
+    )
+
     def __init__(
         self,
         basename,
@@ -28,6 +52,7 @@ class ArtifactInfo:
         wheel_build_number=None,
         last_modified=None,
         size=None,
+        hashes=None,
     ):
         """
         Args:
@@ -40,6 +65,7 @@ class ArtifactInfo:
             wheel_build_number (str | None): Wheel build number, if any
             last_modified (datetime.datetime | None): Timestamp when artifact was last modified, if available
             size (int | None): Size in bytes of artifact, if available
+            hashes (dict | None): Checksums of artifact, keyed by hash algorithm name (e.g. sha256), if available
         """
         self.basename = basename
         self.package_name = package_name
@@ -48,19 +74,20 @@ class ArtifactInfo:
         self.source = source
         self.tags = tags
         self.wheel_build_number = wheel_build_number
-        self.pypi_name = PypiStd.std_package_name(package_name)
-        self.relative_url = "%s/%s" % (self.pypi_name, basename)
         self.last_modified = last_modified
         self.size = size
+        self.hashes = hashes
+        self.pypi_name = PypiStd.std_package_name(package_name)  # Memoized, cheap to compute eagerly
 
     @classmethod
-    def from_basename(cls, basename: str, source=None, last_modified=None, size=None) -> ArtifactInfo:
+    def from_basename(cls, basename: str, source=None, last_modified=None, size=None, hashes=None) -> ArtifactInfo:
         """
         Args:
             basename: Basename to parse
             source: Optional arbitrary object to track provenance of ArtifactInfo
             last_modified (datetime.datetime | None): Timestamp when artifact was last modified, if available
             size (int | None): Size in bytes of artifact, if available
+            hashes (dict | None): Checksums of artifact, keyed by hash algorithm name (e.g. sha256), if available
 
         Returns:
             Parsed artifact info. Raises ValueError if `basename` is not a recognizable sdist/wheel name.
@@ -81,13 +108,14 @@ class ArtifactInfo:
         return cls(
             basename,
             m.group(1),
-            Version(m.group(2), canonical=None),
+            Version.parsed(m.group(2), canonical=None),
             is_wheel=is_wheel,
             source=source,
             tags=tags,
             wheel_build_number=wheel_build_number,
             last_modified=last_modified,
             size=size,
+            hashes=hashes,
         )
 
     def __repr__(self):
@@ -104,6 +132,11 @@ class ArtifactInfo:
     def category(self):
         return "wheel" if self.is_wheel else "sdist"
 
+    @property
+    def relative_url(self):
+        """(str): Url of artifact, relative to a pypi simple index"""
+        return "%s/%s" % (self.pypi_name, self.basename)
+
     @property
     def is_dirty(self):
         return self.version.is_dirty
@@ -134,18 +167,306 @@ class PypiStd:
     @classmethod
     def std_package_name(cls, name):
         """Standardized pypi package name, single dashes and alphanumeric chars allowed only"""
+        if isinstance(name, str):
+            return cls._std_package_name(name)
+
+    @classmethod
+    def std_wheel_basename(cls, name):
+        """Standardized wheel file base name, single underscores, dots and alphanumeric chars only"""
+        if isinstance(name, str):
+            return cls._std_wheel_basename(name)
+
+    # Memoized: large index listings refer to the same few package names over and over
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def _std_package_name(cls, name):
         if cls.is_acceptable(name):
             name = name.replace(".", "-")
             dashed = cls.RR_PYPI.sub("-", name).lower()
             return cls.RR_PYPI.sub("-", dashed)  # 2nd pass to ensure no `--` remains
 
     @classmethod
-    def std_wheel_basename(cls, name):
-        """Standardized wheel file base name, single underscores, dots and alphanumeric chars only"""
+    @functools.lru_cache(maxsize=4096)
+    def _std_wheel_basename(cls, name):
         if cls.is_acceptable(name):
             return cls.RR_WHEEL.sub("_", name)
 
 
+class PypiSimpleIndex:
+    """
+    Incremental parser of a PEP-503 (html) or PEP-691 (json) simple index project page, such as https://pypi.org/simple/<name>/
+
+    Content can be fed chunk by chunk as it is received, artifacts are yielded as soon as their entry is complete,
+    so memory usage remains flat even for very large pages.
+
+    Example usage:
+        response = client.get_response("simple/foo/", stream=True)
+        for artifact in PypiSimpleIndex.artifacts(response):
+            ...
+    """
+
+    def __init__(self, source=None):
+        """
+        Args:
+            source: Optional arbitrary object to track provenance of yielded ArtifactInfo-s (e.g. url of page)
+        """
+        self.source = source
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._parser = None  # Determined from first non-blank character received: json or html
+
+    @classmethod
+    def artifacts(cls, content, source=None, chunk_size=65536):
+        """
+        Args:
+            content (RestResponse | str | Path | IO | Iterable[bytes | str]): Page to parse: a response, a local file, or chunks
+            source: Optional arbitrary object to track provenance of yielded ArtifactInfo-s (default: url of response, or path)
+            chunk_size (int): Size of chunks to read at a time, when reading from a response or file
+
+        Yields:
+            (ArtifactInfo): Artifacts with an acceptable name (see `PypiStd.is_acceptable()`), in the order they appear in page
+        """
+        if isinstance(content, (str, Path)):
+            with open(content, "rb") as fh:
+                yield from cls.artifacts(fh, source=source or str(content), chunk_size=chunk_size)
+
+            return
+
+        if hasattr(content, "iter_content"):
+            source = source or getattr(content, "url", None)
+            content = content.iter_content(chunk_size=chunk_size)
+
+        elif hasattr(content, "read"):
+            content = iter(functools.partial(content.read, chunk_size), b"")
+
+        parser = cls(source=source)
+        for chunk in content:
+            yield from parser.feed(chunk)
+
+        yield from parser.close()
+
+    def feed(self, chunk):
+        """
+        Args:
+            chunk (bytes | str): Next chunk of content
+
+        Returns:
+            (list[ArtifactInfo]): Artifacts whose entry got completed by this chunk
+        """
+        text = self._decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        if self._parser is None:
+            stripped = text.lstrip()
+            if not stripped:
+                return []
+
+            self._parser = _SimpleIndexJsonParser() if stripped.startswith("{") else _SimpleIndexHtmlParser()
+
+        self._parser.feed(text)
+        return self._completed_artifacts()
+
+    def close(self):
+        """
+        Returns:
+            (list[ArtifactInfo]): Remaining artifacts, once all content was fed
+        """
+        if self._parser is None:
+            return []
+
+        self._parser.feed(self._decoder.decode(b"", final=True))
+        self._parser.close()
+        return self._completed_artifacts()
+
+    def _completed_artifacts(self):
+        result = []
+        for basename, hashes, size, upload_time in self._parser.entries:
+            try:
+                info = ArtifactInfo.from_basename(basename, self.source, size=size, hashes=hashes)
+
+            except ValueError:
+                continue  # Not an sdist or wheel (e.g. .egg, .exe, .zip)
+
+            if PypiStd.is_acceptable(info.package_name):
+                info.last_modified = upload_time and _R.lc.rm.to_datetime(upload_time)
+                result.append(info)
+
+        self._parser.entries.clear()
+        return result
+
+
+class _SimpleIndexHtmlParser(HTMLParser):
+    """Collects (basename, hashes, size, upload_time) of anchors in a PEP-503 page"""
+
+    def __init__(self):
+        super().__init__()
+        self.entries = []
+        self._href = None
+        self._text = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            self._href = dict(attrs).get("href") or ""
+            self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == "a" and self._href is not None:
+            url, _, fragment = self._href.partition("#")
+            basename = "".join(self._text).strip() or os.path.basename(url)
+            hash_name, _, hash_value = fragment.partition("=")
+            self.entries.append((basename, {hash_name: hash_value} if hash_value else None, None, None))
+            self._href = None
+
+
+class _SimpleIndexJsonParser:
+    """
+    Collects (basename, hashes, size, upload_time) of 'files' in a PEP-691 page, decoding one file entry at a time.
+    Other top-level values (such as 'versions') are skipped without being decoded, nor buffered.
+    """
+
+    RX_SCALAR_END = re.compile(r"[\s,\]}]")
+    RX_STRING_SPECIAL = re.compile(r'["\\]')
+    RX_STRUCTURE = re.compile(r'["\[\]{}]')
+
+    def __init__(self):
+        self.entries = []
+        self._buffer = ""
+        self._decoder = json.JSONDecoder()
+        self._state = "start"  # Where we are in top-level object: start, key, colon, value, files, next, done
+        self._key = None
+        self._skipping = None  # (depth, in_string, escaped) when skipped value continues in next chunk (depth -1: scalar)
+
+    def feed(self, text):
+        self._buffer += text
+        pos = self._consume()
+        self._buffer = self._buffer[pos:]
+
+    def close(self):
+        if self._state != "done":
+            raise ValueError("Truncated simple index json content: %s" % short(self._buffer))
+
+    def _consume(self):
+        buffer = self._buffer
+        pos = 0
+        while self._state != "done":
+            while pos < len(buffer) and buffer[pos] in " \t\r\n":
+                pos += 1
+
+            if pos >= len(buffer):
+                return pos
+
+            char = buffer[pos]
+            if self._state in ("start", "colon", "next"):
+                expected = {"start": "{", "colon": ":", "next": ",}"}[self._state]
+                if char not in expected:
+                    raise ValueError("Invalid simple index json content, expecting '%s' at: %s" % (expected, short(buffer[pos:])))
+
+                pos += 1
+                self._state = "value" if char == ":" else "done" if char == "}" else "key"
+                continue
+
+            if self._state == "key" and char == "}":
+                self._state = "done"
+                continue
+
+            if self._state == "files" and char in ",]":
+                pos += 1
+                if char == "]":
+                    self._state = "next"
+
+                continue
+
+            if self._state == "value" and self._key == "files" and char == "[":
+                pos += 1
+                self._state = "files"
+                continue
+
+            if self._state == "value" and self._key != "files":
+                pos = self._skipped_value_end(buffer, pos)
+                if pos is None:
+                    return len(buffer)  # Value continues in next chunk, no need to keep what was skipped so far
+
+                self._state = "next"
+                continue
+
+            try:
+                value, end = self._decoder.raw_decode(buffer, pos)
+
+            except json.JSONDecodeError:
+                return pos  # Incomplete, wait for more content
+
+            if end >= len(buffer):
+                return pos  # Value may not be complete yet (e.g. a number), wait for more content
+
+            pos = end
+            if self._state == "key":
+                self._key = value
+                self._state = "colon"
+
+            elif self._state == "value":
+                self._state = "next"
+
+            elif isinstance(value, dict) and value.get("filename"):
+                self.entries.append((value["filename"], value.get("hashes") or None, value.get("size"), value.get("upload-time")))
+
+        return pos
+
+    def _skipped_value_end(self, buffer, pos):
+        """
+        Args:
+            buffer (str): Content to scan
+            pos (int): Position where value to skip starts (or continues, if it started in a previous chunk)
+
+        Returns:
+            (int | None): Position right after skipped value, None if value continues in next chunk
+        """
+        if self._skipping is None:
+            depth, in_string, escaped = -1 if buffer[pos] not in '"[{' else 0, False, False
+
+        else:
+            depth, in_string, escaped = self._skipping
+
+        self._skipping = None
+        while True:
+            if depth < 0:  # Scalar (number, true, false or null)
+                m = self.RX_SCALAR_END.search(buffer, pos)
+
+            elif escaped:
+                if pos >= len(buffer):
+                    break
+
+                pos += 1
+                escaped = False
+                continue
+
+            else:
+                m = (self.RX_STRING_SPECIAL if in_string else self.RX_STRUCTURE).search(buffer, pos)
+
+            if m is None:
+                break
+
+            char = m.group()
+            if depth < 0:
+                return m.start()
+
+            pos = m.end()
+            if char == "\\":
+                escaped = True
+
+            elif char == '"':
+                in_string = not in_string
+                if not in_string and depth == 0:
+                    return pos
+
+            else:
+                depth += 1 if char in "[{" else -1
+                if depth == 0:
+                    return pos
+
+        self._skipping = (depth, in_string, escaped)
+
+
 class PythonSpec:
     """
     Internal canonical reference to a desired python installation, used to find python installations in `PythonDepot`
@@ -315,17 +636,26 @@ class PythonDepot:
     """
 
     _preferred_python: PythonInstallation | None = None  # Preferred python to use, if configured
+    _explicit_preferred = False  # True if preferred python was explicitly configured via `set_preferred_python()`
 
-    def __init__(self, *locations):
+    def __init__(self, *locations, refresh_interval=None):
         """
         Args:
             locations (str | Path): Locations to scan
+            refresh_interval (float | None): If provided, check for changed locations on access, at most every N seconds (see `refresh()`)
         """
         self.locations = [PythonInstallationLocation.from_location(x) for x in flattened(locations)]
         self.invoker = _R.lc.rm.SYS_INFO.invoker_python
+        self.refresh_interval = refresh_interval
+        self._next_refresh = time.monotonic() + refresh_interval if refresh_interval else None
 
-    @cached_property
+    @property
     def available_pythons(self):
+        self._auto_refresh()
+        return self._available_pythons
+
+    @cached_property
+    def _available_pythons(self):
         result = []
         for location in self.locations:
             result.extend(location.available_pythons)
@@ -338,6 +668,7 @@ class PythonDepot:
         Returns:
             (PythonInstallation | None): Preferred python to use, either explicitly configured, or auto-determined from locations
         """
+        self._auto_refresh()
         if self._preferred_python is None:
             for location in self.locations:
                 python = location.preferred_python
@@ -347,6 +678,27 @@ class PythonDepot:
 
         return self._preferred_python
 
+    def refresh(self):
+        """
+        Rescan locations that changed since they were scanned, handy for long-running processes.
+        Can be called periodically from a heartbeat task, for example: `Heartbeat.add_task(depot.refresh, frequency=60)`
+
+        Returns:
+            (list[PythonInstallationLocation]): Locations that changed (only those get rescanned, on next access)
+        """
+        changed = [location for location in self.locations if location.refresh()]
+        if changed:
+            self.__dict__.pop("_available_pythons", None)
+            if not self._explicit_preferred:
+                self._preferred_python = None
+
+        return changed
+
+    def _auto_refresh(self):
+        if self._next_refresh is not None and time.monotonic() >= self._next_refresh:
+            self._next_refresh = time.monotonic() + self.refresh_interval
+            self.refresh()
+
     def set_preferred_python(self, *specs):
         """
         Args:
@@ -356,6 +708,7 @@ class PythonDepot:
             python = self.find_python(spec)
             if python and not python.problem:
                 self._preferred_python = python
+                self._explicit_preferred = True
                 return
 
     def find_python(self, spec):
@@ -375,6 +728,7 @@ class PythonDepot:
         if isinstance(spec, Path):
             return self._from_path(spec)
 
+        self._auto_refresh()
         python = self._find_python(spec)
         if python is None:
             if not isinstance(spec, Path):
@@ -433,6 +787,23 @@ class Version:
     Parse versions according to PEP-440, including ordering.
     """
 
+    # Attributes computed at construction time are slotted, `__dict__` is there for the (less commonly used) cached properties only
+    __slots__ = (
+        "__dict__",
+        "components",
+        "epoch",
+        "given_components",
+        "given_components_count",
+        "given_text",
+        "ignored",
+        "local_part",
+        "prerelease",
+        "release_number",
+        "sort_key",
+        "suffix",
+        "text",
+    )
+
     text: str
 
     def __init__(self, text, max_parts=5, canonical: bool | None = False):
@@ -448,11 +819,14 @@ class Version:
         """
         self.given_text = text
         self.given_components = None  # Components as given by 'text'
+        self.given_components_count = 0
         self.text = text or ""
         self.components = None  # tuple of components with exactly 'max_parts', autofilled with zeros
         self.epoch = 0
         self.local_part = None
         self.prerelease = None
+        self.release_number = None
+        self.sort_key = (0, 0)  # Total order key, invalid versions sort lower than valid ones (within same epoch)
         self.suffix = None
         m = _R.lc.rx_version.match(self.text)
         if not m:
@@ -480,9 +854,11 @@ class Version:
 
         components: list[int | str] = [int(c) for c in m.group("main").split(".")]
         if len(components) > max_parts:
+            self.sort_key = (self.epoch, 0)
             return  # Invalid version, too many parts
 
         self.given_components = tuple(components)
+        self.given_components_count = len(components)
         while len(components) < max_parts:
             components.append(0)
 
@@ -490,6 +866,12 @@ class Version:
         components.append(int(rel_num or 0))
         components.append(rel or "")
         self.components = tuple(components)
+        # Order: epoch, components, prereleases before final, then local parts (numeric parts sort higher than textual ones)
+        local_key = ()
+        if self.local_part:
+            local_key = tuple((1, int(x)) if x.isdigit() else (0, x) for x in self.local_part.split("."))
+
+        self.sort_key = (self.epoch, 1, self.components, (0, self.prerelease) if self.prerelease else (1,), local_key)
         if canonical is True:
             self.text = self.pep_440 or ""
 
@@ -537,6 +919,22 @@ class Version:
 
         return cls.from_object(text or default)
 
+    @classmethod
+    @functools.lru_cache(maxsize=8192)
+    def parsed(cls, text: str, canonical: bool | None = False) -> Version:
+        """
+        Interned version: parsing the same `text` again yields the same (shared, to be treated as read-only) Version object.
+        Handy when lots of versions get parsed, for example from a pypi index, where each version appears in several artifacts.
+
+        Args:
+            text: Text to be parsed
+            canonical: None: loose parsing, False: strict parsing, version left as-is, True: Turn into canonical PEP-440
+
+        Returns:
+            Parsed version (may not be valid)
+        """
+        return cls(text, canonical=canonical)
+
     def __repr__(self):
         return self.text
 
@@ -557,41 +955,11 @@ class Version:
         )
 
     def __lt__(self, other):
-        other = Version.from_object(other)
-        if isinstance(other, Version):
-            if self.epoch != other.epoch:
-                return self.epoch < other.epoch
-
-            if self.components is None or other.components is None:
-                return bool(other.components)
-
-            if self.components == other.components:
-                if self.prerelease == other.prerelease:
-                    my_parts = self.local_parts
-                    other_parts = other.local_parts
-                    if my_parts is None or other_parts is None:
-                        return bool(other_parts)
-
-                    for mine, theirs in zip(my_parts, other_parts, strict=False):
-                        if mine == theirs:
-                            continue
-
-                        if theirs.isdigit():
-                            return not mine.isdigit() or int(mine) < int(theirs)
-
-                        if mine.isdigit():
-                            return False
-
-                        return mine < theirs
+        if not isinstance(other, Version):
+            other = Version.from_object(other)
 
-                    return len(my_parts) < len(other_parts)
-
-                if self.prerelease is None or other.prerelease is None:
-                    return bool(self.prerelease)
-
-                return self.prerelease < other.prerelease
-
-            return self.components < other.components
+        if other is not None and other.is_valid:
+            return self.sort_key < other.sort_key
 
     def __le__(self, other):
         other = Version.from_object(other)
@@ -605,20 +973,10 @@ class Version:
         other = Version.from_object(other)
         return other is None or other < self
 
-    @cached_property
-    def given_components_count(self):
-        return len(self.given_components) if self.given_components else 0
-
     @cached_property
     def local_parts(self) -> list[str] | None:
-        """Local parts are only needed when comparing versions that differ solely by local part..."""
         if self.local_part:
-            v = getattr(self, "_local_parts", None)
-            if v is None:
-                v = self.local_part.split(".")
-                self._local_parts = v
-
-            return v
+            return self.local_part.split(".")
 
     @cached_property
     def is_dirty(self):
@@ -630,7 +988,7 @@ class Version:
         """Is this a final version as per PEP-440?"""
         return self.is_valid and not self.prerelease
 
-    @cached_property
+    @property
     def is_valid(self):
         """Is this version valid?"""
         return self.components is not None
@@ -693,6 +1051,142 @@ class Version:
             return "".join(result)
 
 
+class VersionSpecifier:
+    """
+    Compiled PEP-440 version specifier, such as '>=3.8,<3.13,!=3.10.2'
+
+    Specifier is parsed once into sorted, disjoint ranges of `Version.sort_key`-s,
+    allowing to efficiently filter large amounts of versions (or artifacts) against it.
+
+    Example usage:
+        spec = VersionSpecifier(">=3.8,<3.13,!=3.10.2")
+        latest = spec.highest(artifacts)
+    """
+
+    RX_CLAUSE = re.compile(r"^(~=|===|==|!=|<=|>=|<|>)\s*(\S+)$")
+
+    def __init__(self, text: str, prereleases: bool | None = None):
+        """
+        Args:
+            text: Comma separated clauses, e.g: >=3.8,<3.13,!=3.10.2 (empty: any version)
+            prereleases: Accept pre-releases? (default: only if a clause explicitly mentions a pre-release, as per PEP-440)
+        """
+        self.text = text
+        self.arbitrary = None  # Text of `===` clause, if any
+        ranges = [(_LOWEST, True, _HIGHEST, True)]
+        mentions_prerelease = False
+        for clause in flattened(text, split=",", strip=True):
+            m = self.RX_CLAUSE.match(clause)
+            if not m:
+                raise ValueError("Invalid version specifier: %r" % clause)
+
+            op, vtext = m.groups()
+            if op == "===":
+                self.arbitrary = vtext.lower()
+                continue
+
+            version = Version(vtext.removesuffix(".*"))
+            if not version.is_valid:
+                raise ValueError("Invalid version in specifier: %r" % clause)
+
+            mentions_prerelease = mentions_prerelease or bool(version.prerelease)
+            ranges = _intersected_ranges(ranges, _clause_ranges(op, version, clause))
+
+        self.prereleases = mentions_prerelease if prereleases is None else bool(prereleases)
+        self.ranges = ranges
+        self._lows = [r[0] for r in ranges]
+
+    def __repr__(self):
+        return self.text
+
+    def __contains__(self, item):
+        return self.matches(item)
+
+    def matches(self, item) -> bool:
+        """
+        Args:
+            item (Version | ArtifactInfo | str): Version (or object with a `.version` attribute) to check
+
+        Returns:
+            True if `item` satisfies this specifier
+        """
+        version = _item_version(item)
+        if self.arbitrary is not None:
+            if version.text.lower() != self.arbitrary:
+                return False
+
+            if not version.is_valid:
+                return True  # Arbitrary equality is the only way to match non-PEP-440 versions
+
+        elif not self._is_acceptable(version):
+            return False
+
+        key = version.sort_key
+        i = bisect.bisect_right(self._lows, key) - 1
+        if i < 0:
+            return False
+
+        low, low_inclusive, high, high_inclusive = self.ranges[i]
+        return (low_inclusive or key != low) and (key < high or (high_inclusive and key == high))
+
+    def filtered(self, items, presorted=False):
+        """
+        Args:
+            items (Iterable[Version | ArtifactInfo | str]): Items to filter
+            presorted (bool): If True, `items` is a sequence sorted by version: sections outside of this specifier's ranges
+                              are then skipped via binary search, instead of looking at each item
+
+        Yields:
+            (Version | ArtifactInfo | str): Items satisfying this specifier (in given order)
+        """
+        if not presorted or self.arbitrary is not None:
+            yield from (item for item in items if self.matches(item))
+            return
+
+        for start, end in self._sections(items):
+            for i in range(start, end):
+                item = items[i]
+                if self._is_acceptable(_item_version(item)):
+                    yield item
+
+    def highest(self, items, presorted=False):
+        """
+        Args:
+            items (Iterable[Version | ArtifactInfo | str]): Items to look at
+            presorted (bool): If True, `items` is a sequence sorted by version: look only at the end of its matching sections
+
+        Returns:
+            (Version | ArtifactInfo | str | None): Item with the highest version satisfying this specifier, if any
+        """
+        if presorted and self.arbitrary is None:
+            for start, end in reversed(list(self._sections(items))):
+                for i in range(end - 1, start - 1, -1):
+                    if self._is_acceptable(_item_version(items[i])):
+                        return items[i]
+
+            return None
+
+        best = best_key = None
+        for item in items:
+            if self.matches(item):
+                key = _item_version(item).sort_key
+                if best_key is None or key > best_key:
+                    best, best_key = item, key
+
+        return best
+
+    def _is_acceptable(self, version):
+        return version.is_valid and (self.prereleases or not version.prerelease)
+
+    def _sections(self, items):
+        """(start, end) index of the sections of sorted `items` falling within each range of this specifier"""
+        for low, low_inclusive, high, high_inclusive in self.ranges:
+            start = (bisect.bisect_left if low_inclusive else bisect.bisect_right)(items, low, key=_item_sort_key)
+            end = (bisect.bisect_right if high_inclusive else bisect.bisect_left)(items, high, key=_item_sort_key)
+            if start < end:
+                yield start, end
+
+
 class PythonInstallation:
     """Models a specific python installation"""
 
@@ -709,7 +1203,7 @@ class PythonInstallation:
         self.problem = inspection.problem
         version = None
         if not self.problem:
-            version = Version(inspection.version)
+            version = Version.parsed(inspection.version)
             if not version.is_valid:
                 self.problem = f"invalid version '{version.text}'"
                 version = None
@@ -792,6 +1286,17 @@ class PythonInstallation:
         Returns:
             (PythonInstallation): Associated installation
         """
+        return cls(cls.folder_executable(folder), short_name=short_name)
+
+    @staticmethod
+    def folder_executable(folder):
+        """
+        Args:
+            folder (Path): Path to folder
+
+        Returns:
+            (Path): Path to python executable in `folder` (or its bin/ sub-folder)
+        """
         if folder.name != "bin":
             bin_folder = folder / "bin"
             if bin_folder.is_dir():
@@ -801,7 +1306,7 @@ class PythonInstallation:
         if not is_executable(path):
             path = folder / "python"
 
-        return cls(path, short_name=short_name)
+        return path
 
     @property
     def is_invoker(self):
@@ -863,6 +1368,8 @@ class PythonInstallationLocation:
     def __init__(self, location):
         self.location = location
         self._preferred_python: PythonInstallation | None = UNSET  # Auto-selected preferred python from this location
+        self._scanned_fingerprint = None  # Modification times of watched folders, as of when this location was scanned
+        self._lazy_found: dict[Path, PythonInstallation] = {}  # Pythons inspected by `_lazy_find_python()`, by executable
 
     def __repr__(self):
         return short(self.location)
@@ -894,27 +1401,91 @@ class PythonInstallationLocation:
                     if not python.problem:
                         return python
 
-    def _scanned_location(self):
+    def _candidates(self):
         """
         Returns:
-            (list[PythonInstallation]): Python installations found in this location
+            (list[tuple[Path, str | None]] | None): Python executables in this location (not inspected yet), with their optional short name
         """
         # Default: pythons from a folder containing pythonM.m symlinks, eg: /opt/my-python-binaries/
-        result = []
-        for item in ls_dir(self.location):
+        candidates = []
+        for item in ls_dir(self.scan_folder):
             if item.is_file():
                 m = RX_PYTHON_BASENAME.match(item.name)
                 if m and m.group(2):
-                    python = PythonInstallation(item)
-                    if not python.problem:
-                        result.append(python)
+                    candidates.append((item, None))
+
+        return candidates
+
+    def _scanned_location(self):
+        """
+        Returns:
+            (list[PythonInstallation]): Python installations found in this location
+        """
+        return sorted(self._installations(self._candidates()), reverse=True)
+
+    def _lazy_find_python(self, spec):
+        """
+        Find python satisfying `spec`, inspecting candidates on demand, in the order implied by their file names.
+        Candidates whose name (e.g. `python3.12`, or pyenv folder `3.12.1`) can't satisfy `spec` are not inspected at all.
+        Only plain version names are trusted, a location with any other name (e.g. `pyston-2.3.5`) gets fully scanned instead.
+
+        Args:
+            spec (PythonSpec): Spec to satisfy
+
+        Returns:
+            (PythonInstallation | None | UNSET): Python satisfying `spec`, UNSET if file names can't be relied upon for this location
+        """
+        candidates = self._candidates()
+        if candidates is None:
+            return UNSET
+
+        hinted = []
+        for exe, short_name in candidates:
+            basename = os.path.basename(short_name or exe.name)
+            if not RX_PYTHON_VERSION_NAME.match(basename):
+                return UNSET  # Name doesn't necessarily reflect python version (e.g. `pyston-2.3.5`)
+
+            hint = Version.extracted_from_text(basename)
+            if hint is None or hint.given_components_count < 2:
+                return UNSET  # Not precise enough to determine order
+
+            hinted.append((PythonSpec(PythonSpec.guess_family(str(exe.resolve())), hint), str(exe), exe, short_name))
+
+        self._scanned_fingerprint = self._scanned_fingerprint or self._fingerprint()  # Allows `refresh()` to forget inspections
+        for hint, _, exe, short_name in sorted(hinted, key=lambda x: x[:2], reverse=True):
+            if hint.family == spec.family and _may_satisfy(hint.version, spec):
+                python = PythonInstallation(exe, short_name=short_name)
+                self._lazy_found[exe] = python
+                if not python.problem:
+                    if not _may_satisfy(hint.version, PythonSpec(python.family, python.full_version)):
+                        return UNSET  # Misleading file name, order can't be trusted
+
+                    if python.satisfies(spec):
+                        return python
+
+    @staticmethod
+    def _installations(candidates):
+        """
+        Args:
+            candidates (list[tuple[Path, str | None]]): Python executables, with their optional short name
 
-        return sorted(result, reverse=True)
+        Returns:
+            (list[PythonInstallation]): Corresponding python installations (without problems), inspected concurrently
+        """
+        PythonSimpleInspection.prefetch(exe for exe, _ in candidates)
+        result = []
+        for exe, short_name in candidates:
+            python = PythonInstallation(exe, short_name=short_name)
+            if not python.problem:
+                result.append(python)
+
+        return result
 
     @property
     def preferred_python(self):
         """(PythonInstallation | None): Preferred python found in this location"""
         if self._preferred_python is UNSET:
+            self._scanned_fingerprint = self._scanned_fingerprint or self._fingerprint()
             self._preferred_python = self._auto_determined_preferred()
 
         return self._preferred_python
@@ -925,9 +1496,64 @@ class PythonInstallationLocation:
         Returns:
             (list[PythonInstallation]): Python installations found in this location
         """
+        self._scanned_fingerprint = self._scanned_fingerprint or self._fingerprint()
         return self._scanned_location()
 
+    @property
+    def scan_folder(self):
+        """(str | Path): Folder that is scanned to find python installations"""
+        return self.location
+
+    def refresh(self) -> bool:
+        """
+        Forget scanned pythons if this location changed since it was scanned (python installed, removed or modified)
+
+        Returns:
+            True if location changed, it will be rescanned on next access (unchanged locations are not rescanned)
+        """
+        fingerprint = self._fingerprint()
+        if self._scanned_fingerprint is None or self._scanned_fingerprint == fingerprint:
+            return False
+
+        # Inspections of pythons in unchanged folders remain valid, no need to re-inspect those
+        scanned = dict(self._scanned_fingerprint)
+        changed = {folder for folder, mtime in fingerprint if scanned.get(folder) != mtime}
+        previous = list(self.__dict__.pop("available_pythons", None) or [])
+        previous.extend(self._lazy_found.values())
+        self._lazy_found = {}
+        if self._preferred_python:
+            previous.append(self._preferred_python)
+
+        for python in previous:
+            if str(python.executable.parent) in changed or not python.real_exe.exists():
+                PythonSimpleInspection.forget(python.executable, python.real_exe)
+
+        self._preferred_python = UNSET
+        self._scanned_fingerprint = None
+        return True
+
+    def _fingerprint(self):
+        """(tuple): Modification times of watched folders, changes whenever a python installation is added or removed"""
+        result = []
+        for folder in dict.fromkeys(str(x) for x in self._watched_folders()):
+            try:
+                result.append((folder, os.stat(folder).st_mtime_ns))
+
+            except OSError:
+                result.append((folder, None))
+
+        return tuple(result)
+
+    def _watched_folders(self):
+        """(list[str | Path]): Folders that change (modification time) when pythons get installed or removed in this location"""
+        return [self.scan_folder, *(exe.parent for exe, _ in self._candidates())]
+
     def find_python(self, spec):
+        if "available_pythons" not in self.__dict__:  # Not scanned yet: avoid inspecting all pythons, if possible
+            python = self._lazy_find_python(spec)
+            if python is not UNSET:
+                return python
+
         for python in self.available_pythons:
             if python.satisfies(spec):
                 return python
@@ -949,26 +1575,37 @@ class PythonInstallationLocationPathEnvVar(PythonInstallationLocation):
     def _auto_determined_preferred(self):
         """When using PATH env var, don't pick any preferred python"""
 
-    def _scanned_location(self):
-        result = []
+    def _candidates(self):
+        """Order of PATH matters, candidates can't be sorted by version"""
+
+    def _watched_folders(self):
+        return self._path_folders()
+
+    @staticmethod
+    def _path_folders():
+        """(list[str]): Folders from PATH env var, excluding current virtualenv's"""
         venv = os.environ.get("VIRTUAL_ENV")
-        for folder in flattened(os.environ.get("PATH"), split=os.pathsep):
-            if venv and folder.startswith(venv):
-                continue  # Ignore python installations from virtualenv
+        return [x for x in flattened(os.environ.get("PATH"), split=os.pathsep) if not venv or not x.startswith(venv)]
 
+    def _scanned_location(self):
+        folders = []
+        for folder in self._path_folders():
             general = []  # General symlinks, eg: `python3` and `python`
             major_minors = []  # Major.minor symlinks, eg: `python3.14`
             for item in ls_dir(folder):
                 if is_executable(item):
                     m = RX_PYTHON_BASENAME.match(item.name)
                     if m:
-                        python = PythonInstallation(item)
-                        if not python.problem:
-                            target = major_minors if m.group(2) else general
-                            target.append(python)
+                        target = major_minors if m.group(2) else general
+                        target.append((item, None))
 
-            result.extend(sorted(general, key=lambda x: x.executable))
-            result.extend(sorted(major_minors, reverse=True))
+            folders.append((general, major_minors))
+
+        PythonSimpleInspection.prefetch(exe for general, major_minors in folders for exe, _ in general + major_minors)
+        result = []
+        for general, major_minors in folders:
+            result.extend(sorted(self._installations(general), key=lambda x: x.executable))
+            result.extend(sorted(self._installations(major_minors), reverse=True))
 
         return result
 
@@ -976,39 +1613,54 @@ class PythonInstallationLocationPathEnvVar(PythonInstallationLocation):
 class PythonInstallationLocationPyenv(PythonInstallationLocation):
     """Pythons from pyenv-like location, eg: ~/.pyenv/versions/**"""
 
-    def _scanned_location(self):
-        result = []
-        for item in ls_dir(os.path.dirname(self.location)):
+    @property
+    def scan_folder(self):
+        return os.path.dirname(self.location)
+
+    def _candidates(self):
+        candidates = []
+        for item in ls_dir(self.scan_folder):
             if not item.is_symlink() and item.is_dir():
                 bin_folder = item / "bin"
                 if bin_folder.is_dir():
-                    python = PythonInstallation.from_folder(bin_folder, short_name=short(item))
-                    if not python.problem:
-                        result.append(python)
+                    candidates.append((PythonInstallation.folder_executable(bin_folder), short(item)))
 
-        return sorted(result, reverse=True)
+        return candidates
 
 
 class PythonInstallationLocationSubFolders(PythonInstallationLocation):
     """Pythons from python* directories, eg: /apps/python*"""
 
-    def _scanned_location(self):
-        result = []
-        for item in ls_dir(os.path.dirname(self.location)):
+    @property
+    def scan_folder(self):
+        return os.path.dirname(self.location)
+
+    def _candidates(self):
+        candidates = []
+        for item in ls_dir(self.scan_folder):
             if item.is_dir():
                 m = RX_PYTHON_BASENAME.match(item.name)
                 if m and m.group(2):
-                    python = PythonInstallation(item / "bin" / item.name, short_name=short(item))
-                    if not python.problem:
-                        result.append(python)
+                    candidates.append((item / "bin" / item.name, short(item)))
 
-        return sorted(result, reverse=True)
+        return candidates
 
 
 class PythonSimpleInspection:
     """Simple inspection (version and arch) of a python executable, cached to avoid expensive python process invocations"""
 
+    # Json file where inspections are persisted across runs (keyed by real exe path, invalidated when exe changes), None: disable
+    cache_path: ClassVar = UNSET  # Default: ~/.cache/runez/python-inspections.json (disabled in test runs)
+
+    max_workers: ClassVar[int] = 8  # Max number of python processes to spawn concurrently, see `prefetch()`
+    use_layout: ClassVar[bool] = True  # Deduce version and arch from installation file layout when possible (no process spawned)
+
     _cached: ClassVar = {}
+    _lock = threading.Lock()
+    _persisted: ClassVar[dict | None] = None  # Lazy-loaded contents of `cache_path`
+    _persisted_path: ClassVar[str | None] = None
+    _persisted_dirty: ClassVar[bool] = False  # True when `_persisted` has inspections not saved to `cache_path` yet
+    _persisted_atexit: ClassVar[bool] = False
 
     def __init__(self, version=None, machine=None, problem=None, freethreading=False):
         self.version = version
@@ -1019,11 +1671,55 @@ class PythonSimpleInspection:
     def __repr__(self):
         return self.problem or f"{self.version} ({self.machine})"
 
+    def to_dict(self) -> dict:
+        return {"version": self.version, "machine": self.machine, "freethreading": self.freethreading}
+
+    @classmethod
+    def forget(cls, *paths):
+        """Forget cached inspections of given `paths`, they will be re-inspected on next access"""
+        for path in paths:
+            cls._cached.pop(path, None)
+
     @classmethod
     def register(cls, key, real_exe, inspection):
         cls._cached[key] = (real_exe, inspection)
         cls._cached[real_exe] = (real_exe, inspection)
 
+    @classmethod
+    def resolved_cache_path(cls) -> str | None:
+        """Path to json file where inspections are persisted, if enabled"""
+        path = cls.cache_path
+        if path is UNSET:
+            if _R.lc.rm.DEV.current_test():
+                return None  # Don't pollute ~/.cache from test runs
+
+            path = "~/.cache/runez/python-inspections.json"
+
+        return path and os.path.expanduser(path)
+
+    @classmethod
+    def prefetch(cls, executables):
+        """Inspect given `executables` concurrently, so that subsequent `exe_inspection()` calls are served from cache
+
+        Args:
+            executables (Iterable[Path]): Python executables to inspect
+        """
+        pending = {}  # Deduplicated by real exe, no need to inspect the same python installation twice
+        for executable in executables:
+            if executable not in cls._cached:
+                real_exe = executable.resolve()
+                if real_exe not in cls._cached and real_exe not in pending:
+                    pending[real_exe] = executable
+
+        if len(pending) > 1:
+            from concurrent.futures import ThreadPoolExecutor
+
+            cls._load_persisted()
+            with ThreadPoolExecutor(max_workers=min(cls.max_workers, len(pending))) as executor:
+                list(executor.map(cls.exe_inspection, pending.values()))
+
+            cls.save_persisted()
+
     @classmethod
     def exe_inspection(cls, executable):
         cached = cls._cached.get(executable)
@@ -1038,22 +1734,266 @@ class PythonSimpleInspection:
         if not is_executable(executable):
             return real_exe, cls(problem="not available")
 
+        signature = _exe_signature(real_exe)
+        result = cls._from_persisted(real_exe, signature)
+        if result is None and cls.use_layout:
+            result = cls.layout_inspection(real_exe)
+
+        if result is None:
+            result = cls._spawned_inspection(real_exe)
+            if not result.problem:
+                cls._persist(real_exe, signature, result)
+
+        cls.register(executable, real_exe, result)
+        return real_exe, result
+
+    @classmethod
+    def layout_inspection(cls, real_exe):
+        """Inspection deduced from the file layout of the python installation, without spawning a python process
+
+        Only conclusive for standard installations (pyenv, python.org, most distros, etc.): an executable named `pythonX.Y[t]`,
+        with a `../include/pythonX.Y[t]/patchlevel.h` header, and an ELF or Mach-O binary of a known architecture.
+
+        Args:
+            real_exe (Path): Fully resolved path to python executable
+
+        Returns:
+            (PythonSimpleInspection | None): Inspection, if installation could be reliably identified from its file layout
+        """
+        m = RX_PYTHON_BASENAME.match(real_exe.name)
+        if not m or not m.group(2):
+            return None
+
+        mm, freethreading = m.group(1), bool(m.group(3))
+        include = real_exe.parent.parent / "include"
+        abi_flags = ("t",) if freethreading else ("", "m")  # Python < 3.8 used an 'm' ABI flag
+        for abi_flag in abi_flags:
+            version = _header_version(include / f"python{mm}{abi_flag}" / "patchlevel.h")
+            if version:
+                break
+
+        else:
+            return None
+
+        if not version.startswith(f"{mm}."):
+            return None
+
+        machine = _exe_machine(real_exe)
+        if machine:
+            return cls(version=version, machine=machine, freethreading=freethreading)
+
+    @classmethod
+    def _load_persisted(cls):
+        """Load inspections persisted by previous runs, if not already done"""
+        with cls._lock:
+            if cls._persisted is None:
+                # Resolved once, from calling thread (`DEV.current_test()` can't tell from a worker thread)
+                cls._persisted_path = path = cls.resolved_cache_path()
+                persisted = path and _R.lc.rm.read_json(path, logger=None)
+                cls._persisted = persisted if isinstance(persisted, dict) else {}
+
+            return cls._persisted
+
+    @classmethod
+    def _from_persisted(cls, real_exe, signature):
+        entry = cls._load_persisted().get(str(real_exe))
+        if isinstance(entry, dict) and entry.get("signature") == signature:
+            return cls(version=entry.get("version"), machine=entry.get("machine"), freethreading=entry.get("freethreading"))
+
+    @classmethod
+    def save_persisted(cls):
+        """Save new inspections to `cache_path`, if any (done once per `prefetch()`, and at exit)"""
+        with cls._lock:
+            if cls._persisted_dirty:
+                cls._persisted_dirty = False
+                cls._persisted = {k: v for k, v in cls._persisted.items() if os.path.exists(k)}  # Forget deleted pythons
+                _R.lc.rm.save_json(cls._persisted, cls._persisted_path, atomic=True, fatal=False, logger=None)
+
+    @classmethod
+    def _persist(cls, real_exe, signature, inspection):
+        if cls._persisted_path and signature:
+            with cls._lock:
+                cls._persisted[str(real_exe)] = {"signature": signature, **inspection.to_dict()}
+                cls._persisted_dirty = True
+                if not cls._persisted_atexit:
+                    cls._persisted_atexit = True
+                    atexit.register(cls.save_persisted)
+
+    @classmethod
+    def _spawned_inspection(cls, real_exe):
+        """Inspect python installation by running `_inspect.py` with it"""
         try:
             import runez._inspect
 
             r = run(real_exe, runez._inspect.__file__, dryrun=False, fatal=False, logger=None)
-            if r.succeeded:
-                result = json.loads(r.output)
-                if not isinstance(result, dict) or not result.get("version"):
-                    return real_exe, cls(problem=f"internal error: _inspect.py returned '{short(result)}'")
-
-                result = cls(**result)
+            if not r.succeeded:
+                return cls(problem=short(r.full_output))
 
-            else:
-                result = cls(problem=short(r.full_output))
+            result = json.loads(r.output)
 
         except Exception as e:
-            result = cls(problem=f"internal error: {e}")
+            return cls(problem=f"internal error: {e}")
 
-        cls.register(executable, real_exe, result)
-        return real_exe, result
+        if not isinstance(result, dict) or not result.get("version"):
+            return cls(problem=f"internal error: _inspect.py returned '{short(result)}'")
+
+        return cls(**result)
+
+
+# Range boundaries below and above any `Version.sort_key`, and above any local part
+_LOWEST = ()
+_HIGHEST = (math.inf,)
+_LOCAL_CEILING = ((2,),)
+
+
+def _clause_ranges(op, version, clause):
+    """
+    Args:
+        op (str): Operator of specifier clause (such as `>=`), except `===`
+        version (Version): Version mentioned in clause
+        clause (str): Clause as given (used in error messages only)
+
+    Returns:
+        (list[tuple]): Ranges (low, low_inclusive, high, high_inclusive) of sort keys satisfying clause
+    """
+    epoch = version.epoch
+    is_wildcard = clause.endswith(".*")
+    if is_wildcard or op == "~=":
+        # Pre/post/dev suffix of `~=` clause is ignored to determine prefix, but is still used as lower bound
+        if (is_wildcard and (op not in ("==", "!=") or version.suffix)) or version.local_part:
+            raise ValueError("Invalid version specifier: %r" % clause)
+
+        prefix = version.given_components
+        if op == "~=":
+            if len(prefix) < 2:
+                raise ValueError("Invalid version specifier: %r" % clause)
+
+            prefix = prefix[:-1]
+
+        high = (*prefix[:-1], prefix[-1] + 1)
+        ranges = [((epoch, 1, prefix), True, (epoch, 1, high), False)]
+        if op == "~=":
+            return _intersected_ranges(ranges, [(version.sort_key, True, _HIGHEST, True)])
+
+        return _complemented_ranges(ranges) if op == "!=" else ranges
+
+    key = version.sort_key
+    if op in ("==", "!="):
+        # Local part of candidate is ignored if clause doesn't mention any
+        ranges = [(key, True, key if version.local_part else (*key[:4], _LOCAL_CEILING), True)]
+        return _complemented_ranges(ranges) if op == "!=" else ranges
+
+    if op == ">=":
+        return [(key, True, _HIGHEST, True)]
+
+    if op == "<=":
+        return [(_LOWEST, True, (*key[:4], _LOCAL_CEILING), True)]
+
+    if op == "<":
+        # Pre/dev-releases of given version (or post-release) are not accepted (unless clause refers to a pre/dev-release itself)
+        return [(_LOWEST, True, key if version.prerelease else (epoch, 1, version.components), False)]
+
+    # `>`: Post-releases of given version are not accepted (unless clause refers to a post-release), nor local versions
+    pre = version.prerelease
+    if not pre and version.release_number is None:
+        low = (epoch, 1, (*version.components[:-2], math.inf))
+
+    elif pre and not pre[2] and pre[4] == "z":
+        low = (epoch, 1, version.components, (0, (*pre[:2], "~")))  # Above post-releases of given pre-release, such as `1.0rc1.post1`
+
+    else:
+        low = (*key[:4], _LOCAL_CEILING)
+
+    return [(low, False, _HIGHEST, True)]
+
+
+def _complemented_ranges(ranges):
+    result = []
+    low, low_inclusive = _LOWEST, True
+    for range_low, range_low_inclusive, range_high, range_high_inclusive in ranges:
+        result.append((low, low_inclusive, range_low, not range_low_inclusive))
+        low, low_inclusive = range_high, not range_high_inclusive
+
+    result.append((low, low_inclusive, _HIGHEST, True))
+    return [r for r in result if r[0] < r[2] or (r[0] == r[2] and r[1] and r[3])]
+
+
+def _intersected_ranges(ranges1, ranges2):
+    result = []
+    for low1, low_inclusive1, high1, high_inclusive1 in ranges1:
+        for low2, low_inclusive2, high2, high_inclusive2 in ranges2:
+            low, low_inclusive = max((low1, low_inclusive1), (low2, low_inclusive2), key=lambda x: (x[0], not x[1]))
+            high, high_inclusive = min((high1, high_inclusive1), (high2, high_inclusive2), key=lambda x: (x[0], x[1]))
+            if low < high or (low == high and low_inclusive and high_inclusive):
+                result.append((low, low_inclusive, high, high_inclusive))
+
+    return result
+
+
+def _item_version(item) -> Version:
+    if isinstance(item, Version):
+        return item
+
+    if isinstance(item, str):
+        return Version.parsed(item)
+
+    return item.version
+
+
+def _item_sort_key(item):
+    return _item_version(item).sort_key
+
+
+def _may_satisfy(version, spec):
+    """Could a python with (possibly partially known) `version` satisfy `spec`? Only components known on both sides are compared"""
+    count = min(version.given_components_count, spec.version.given_components_count)
+    given = version.given_components[:count]
+    wanted = spec.version.given_components[:count]
+    return given >= wanted if spec.is_min_spec else given == wanted
+
+
+# Architectures as reported by `platform.machine()`, keyed by ELF `e_machine` / Mach-O `cputype`
+_ELF_MACHINES = {0x3E: "x86_64", 0xB7: "aarch64", 0x16: "s390x"}
+_MACHO_MACHINES = {0x01000007: "x86_64", 0x0100000C: "arm64"}
+
+
+def _exe_machine(path) -> str | None:
+    """Architecture of executable binary with `path`, read from its ELF or Mach-O header (None if not conclusive)"""
+    try:
+        with open(path, "rb") as fh:
+            header = fh.read(512)
+
+    except OSError:
+        return None
+
+    if header[:4] == b"\x7fELF" and len(header) >= 20:
+        byteorder = "little" if header[5] == 1 else "big"
+        return _ELF_MACHINES.get(int.from_bytes(header[18:20], byteorder))
+
+    if header[:4] in (b"\xcf\xfa\xed\xfe", b"\xce\xfa\xed\xfe") and len(header) >= 8:  # Thin Mach-O, little-endian
+        return _MACHO_MACHINES.get(int.from_bytes(header[4:8], "little"))
+
+    if header[:4] == b"\xca\xfe\xba\xbe" and len(header) >= 8:  # Universal binary: report the slice the host would run
+        import platform
+
+        count = int.from_bytes(header[4:8], "big")
+        machines = {_MACHO_MACHINES.get(int.from_bytes(header[8 + i * 20 : 12 + i * 20], "big")) for i in range(min(count, 16))}
+        host = platform.machine()
+        if host in machines:
+            return host
+
+    return None
+
+
+def _header_version(path) -> str | None:
+    """Version X.Y.Z as defined by `PY_VERSION` in a `patchlevel.h` header"""
+    with contextlib.suppress(OSError), open(path) as fh:
+        m = re.search(r'^#define\s+PY_VERSION\s+"(\d+\.\d+\.\d+)', fh.read(), re.MULTILINE)
+        return m and m.group(1)
+
+
+def _exe_signature(path) -> list | None:
+    """Signature of file with `path`, allowing to detect when it was modified"""
+    with contextlib.suppress(OSError):
+        st = os.stat(path)
+        return [st.st_ino, st.st_size, st.st_mtime_ns]
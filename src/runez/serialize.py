@@ -10,7 +10,7 @@ import json
 import logging
 from typing import ClassVar
 
-from runez.file import ensure_folder, parent_folder
+from runez.file import _open_for_write, ensure_folder, parent_folder
 from runez.system import _R, abort, is_basetype, is_iterable, resolved_path, short, stringified, UNSET
 
 K_INDENTED_SEPARATORS = (",", ": ")
@@ -714,7 +714,20 @@ def represented_json(data, stringify=stringified, dt=str, none=False, indent: in
     return rep
 
 
-def save_json(data, path, stringify=stringified, dt=str, none=False, indent=2, sort_keys=True, fatal=True, logger=UNSET, dryrun=UNSET):
+def save_json(
+    data,
+    path,
+    stringify=stringified,
+    dt=str,
+    none=False,
+    indent=2,
+    sort_keys=True,
+    atomic=False,
+    fsync=False,
+    fatal=True,
+    logger=UNSET,
+    dryrun=UNSET,
+):
     """
     Args:
         data (object | None): Data to serialize and save
@@ -727,6 +740,8 @@ def save_json(data, path, stringify=stringified, dt=str, none=False, indent=2, s
                            - True: No filtering, keep `None` keys/values as-is
         indent (int | None): Indentation to use, if None: use compact (one line) mode
         sort_keys (bool): Whether keys should be sorted
+        atomic (bool): If True, write to a temp file first, then rename it to `path` (readers never see a partially written file)
+        fsync (bool): If True, ensure written data is flushed to disk before returning (along with parent folder, in atomic mode)
         fatal (type | bool | None): True: abort execution on failure, False: don't abort but log, None: don't abort, don't log
         logger (callable | bool | None): Logger to use, True to print(), False to trace(), None to disable log chatter
         dryrun (bool | UNSET | None): Optionally override current dryrun setting
@@ -747,7 +762,7 @@ def save_json(data, path, stringify=stringified, dt=str, none=False, indent=2, s
             return r
 
         data = json_sanitized(data, stringify=stringify, dt=dt, none=none)
-        with open(path, "wt") as fh:
+        with _open_for_write(path, "wt", atomic=atomic, fsync=fsync) as fh:
             json.dump(data, fh, indent=indent, sort_keys=sort_keys, separators=K_INDENTED_SEPARATORS if indent else K_COMPACT_SEPARATORS)
             if indent:
                 fh.write("\n")
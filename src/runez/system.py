@@ -7,6 +7,7 @@ This class should not import any other `runez` class, to avoid circular deps.
 from __future__ import annotations
 
 import contextlib
+import contextvars
 import functools
 import importlib.metadata
 import inspect
@@ -18,6 +19,7 @@ import sys
 import threading
 import unicodedata
 from io import StringIO
+from types import MappingProxyType
 from typing import Any, Callable, ClassVar, Iterator, Literal, NoReturn, overload, TYPE_CHECKING, TypeVar
 
 if TYPE_CHECKING:
@@ -1240,7 +1242,7 @@ class PlatformId:
     rx_base_path = None  # Regex identifying "base" libraries (present on any declination of this system)
     rx_sys_lib = None  # Regex identifying a "system" library (ie: installed in a system folder, not /usr/local and such)
 
-    supported_compression = ("tar", "bz2", "gz", "xz", "zip")
+    supported_compression = ("tar", "bz2", "gz", "xz", "zst", "zip")
 
     def __init__(self, given=None, arch=None, platform=None, subsystem=None):
         """
@@ -1319,7 +1321,7 @@ class PlatformId:
 
             return None
 
-        if extension in ("tar", "tar.bz2", "tar.gz", "tar.xz", "zip"):
+        if extension in ("tar", "tar.bz2", "tar.gz", "tar.xz", "tar.zst", "zip"):
             return extension
 
         if extension in self.supported_compression:
@@ -1696,6 +1698,8 @@ class ThreadGlobalContext:
 
     Thread-local context is a dict per thread (stored in a threading.local()).
     Global context is a simple dict (applies to all threads).
+    Task context is an immutable mapping per `contextvars` context (ie: per asyncio task), see `task_scope()`.
+    `version` is bumped on every modification, allowing consumers to cache what they render from `to_dict()`.
     """
 
     def __init__(self, filter_type):
@@ -1708,9 +1712,12 @@ class ThreadGlobalContext:
         self._tpayload: threading.local | None = None
         self._gpayload: dict | None = None
         self.filter = None
+        self.version = 0
+        self._task_payload = contextvars.ContextVar("runez_log_context", default=None)
 
     def reset(self):
         with self._lock:
+            self.version += 1
             self.filter = None
             self._tpayload = None
             self._gpayload = None
@@ -1733,15 +1740,34 @@ class ThreadGlobalContext:
         with self._lock:
             return bool(self._gpayload)
 
+    def has_task(self):
+        return bool(self._task_payload.get())
+
+    @contextlib.contextmanager
+    def task_scope(self, **values):
+        """Add `values` to logging context of current asyncio task (or `contextvars` context), for the duration of the `with` block
+
+        Tasks spawned from within the block inherit these values, sibling tasks are not affected.
+        """
+        parent = self._task_payload.get()
+        token = self._task_payload.set(MappingProxyType({**parent, **values} if parent else values))
+        try:
+            yield
+
+        finally:
+            self._task_payload.reset(token)
+
     def set_threadlocal(self, **values):
         """Set current thread's logging context to specified `values`"""
         with self._lock:
+            self.version += 1
             tp = self._ensure_threadlocal()
             tp.log_context = values
 
     def add_threadlocal(self, **values):
         """Add `values` to current thread's logging context"""
         with self._lock:
+            self.version += 1
             tp = self._ensure_threadlocal()
             tp.log_context.update(**values)
 
@@ -1751,6 +1777,7 @@ class ThreadGlobalContext:
             name (str): Remove entry with `name` from current thread's context
         """
         with self._lock:
+            self.version += 1
             c = getattr(self._tpayload, "log_context", None)
             if c is not None and name in c:
                 del c[name]
@@ -1761,16 +1788,19 @@ class ThreadGlobalContext:
     def clear_threadlocal(self):
         """Clear current thread's context"""
         with self._lock:
+            self.version += 1
             self._tpayload = None
 
     def set_global(self, **values):
         """Set global logging context to provided `values`"""
         with self._lock:
+            self.version += 1
             self._ensure_global(values)
 
     def add_global(self, **values):
         """Add `values` to global logging context"""
         with self._lock:
+            self.version += 1
             gp = self._ensure_global()
             gp.update(**values)
 
@@ -1780,6 +1810,7 @@ class ThreadGlobalContext:
             name (str): Remove entry with `name` from global context
         """
         with self._lock:
+            self.version += 1
             if self._gpayload is not None:
                 if name in self._gpayload:
                     del self._gpayload[name]
@@ -1790,11 +1821,12 @@ class ThreadGlobalContext:
     def clear_global(self):
         """Clear global context"""
         with self._lock:
+            self.version += 1
             if self._gpayload is not None:
                 self._gpayload = None
 
     def to_dict(self):
-        """dict: Combined global and thread-specific logging context"""
+        """dict: Combined global, thread-specific and task-specific logging context"""
         with self._lock:
             result = {}
             if self._gpayload:
@@ -1804,6 +1836,10 @@ class ThreadGlobalContext:
             if c:
                 result.update(c)
 
+            c = self._task_payload.get()
+            if c:
+                result.update(c)
+
             return result
 
     def _ensure_threadlocal(self) -> threading.local:
@@ -3,6 +3,7 @@ import io
 import logging
 import os
 import pathlib
+import pickle
 import shutil
 from pathlib import Path
 from unittest.mock import patch
@@ -128,6 +129,35 @@ def test_decompress(temp_folder, logged):
     assert dir_contents("unpacked-flat-zip") == expected
 
 
+def test_decompress_multithreaded(temp_folder, monkeypatch, logged):
+    runez.write("test/README.md", "hello", logger=None)
+    expected = dir_contents("test")
+    assert runez.compress("test", "test.tar.xz", threads=0, logger=None) == 1
+    assert runez.decompress("test.tar.xz", "unpacked-xz", simplify=True, logger=None) == 1
+    assert dir_contents("unpacked-xz") == expected
+
+    if runez.file._zstandard_module():
+        assert runez.compress("test", "test.tar.zst", threads=2, logger=None) == 1
+        assert runez.decompress("test.tar.zst", "unpacked-zst", simplify=True, logger=None) == 1
+        assert dir_contents("unpacked-zst") == expected
+
+    # Simulate 'zstandard' module not installed, and no native 'zst' support in stdlib
+    monkeypatch.setattr(runez.file, "_zstandard_module", lambda: None)
+    monkeypatch.setattr("tarfile.TarFile.OPEN_METH", {"tar": "taropen", "xz": "xzopen"})
+    monkeypatch.setitem(runez.file._EXTERNAL_COMPRESSORS, "zst", "no-such-zstd")
+    assert runez.compress("test", "test2.tar.zst", fatal=False) == -1
+    assert "no-such-zstd is not installed" in logged.pop()
+    assert not os.path.exists("test2.tar.zst")
+
+    if runez.which("xz"):
+        # 'xz' CLI behaves like 'zstd' for what we're using, use it as a stand-in to exercise the external program code path
+        monkeypatch.setitem(runez.file._EXTERNAL_COMPRESSORS, "zst", "xz")
+        assert runez.compress("test", "test2.tar.zst", threads=0, logger=None) == 1
+        assert runez.decompress("test2.tar.zst", "unpacked-zst2", simplify=True, logger=None) == 1
+        assert dir_contents("unpacked-zst2") == expected
+        assert not logged
+
+
 def test_edge_cases(temp_folder, monkeypatch, logged):
     # Don't crash for no-ops
     assert runez.copy(Path("some-file"), "some-file") == 0
@@ -408,3 +438,126 @@ def test_parent_folder():
     assert parent == Path("/logs")
     assert runez.parent_folder(parent) == Path("/")
     assert runez.parent_folder("/") == Path("/")
+
+
+def test_write(temp_folder, monkeypatch, logged):
+    # Stream contents from iterables and file-like objects
+    assert runez.write("chunks.txt", (f"line {i}\n" for i in range(3)), logger=None) == 1
+    assert list(runez.readlines("chunks.txt")) == ["line 0", "line 1", "line 2"]
+    assert runez.write("chunks.bin", [b"a", b"b"], logger=None) == 1
+    with open("chunks.txt", "rb") as fh:
+        assert runez.write("copied.txt", fh, logger=None) == 1
+
+    assert runez.checksum("copied.txt") == runez.checksum("chunks.txt")
+    assert runez.write("empty.txt", iter([]), logger=None) == 1
+    assert runez.filesize("chunks.bin", "empty.txt") == 2
+
+    # Atomic mode preserves permissions of existing file, and replaces the target of a symlink
+    runez.write("sample", "hello", logger=None)
+    os.chmod("sample", 0o600)
+    runez.symlink("sample", "link", logger=None)
+    assert runez.write("link", "hello again", atomic=True, fsync=True, logger=None) == 1
+    assert os.path.islink("link")
+    assert list(runez.readlines("sample")) == ["hello again"]
+    assert os.stat("sample").st_mode & 0o777 == 0o600
+    assert runez.write("sample", None, atomic=True, logger=None) == 1
+    assert runez.filesize("sample") == 0
+
+    # Temp file is cleaned up on failure, and target is left untouched
+    runez.write("sample", "original", logger=None)
+    monkeypatch.setattr(os, "replace", exception_raiser())
+    assert runez.write("sample", "new", atomic=True, fatal=False) == -1
+    assert "Can't write to sample" in logged.pop()
+    assert list(runez.readlines("sample")) == ["original"]
+    assert sorted(os.listdir()) == ["chunks.bin", "chunks.txt", "copied.txt", "empty.txt", "link", "sample"]
+
+
+def test_tail(temp_folder, monkeypatch, logged):
+    assert list(runez.tail("no-such-file", logger=logging.debug)) == []
+    assert "Can't read no-such-file" in logged.pop()
+    with pytest.raises(runez.system.AbortException):
+        list(runez.tail("no-such-file", fatal=True, logger=None))
+
+    runez.write("empty", "", logger=None)
+    assert list(runez.tail("empty")) == []
+
+    lines = [f"line {i}" for i in range(1000)]
+    runez.write("sample", "\n".join(lines) + "\n", logger=None)
+    assert list(runez.tail("sample", count=0)) == []
+    assert list(runez.tail("sample", count=3)) == lines[-3:]
+    assert list(runez.tail("sample", count=2000)) == lines
+    assert list(runez.tail("sample", count=1, transform=None)) == ["line 999\n"]
+    with open("sample", "rb") as fh:
+        assert runez.file._last_lines(fh, 500, blocksize=16) == [f"{line}\n".encode() for line in lines[-500:]]
+
+    runez.write("sample", "a\nb", logger=None)
+    assert list(runez.tail("sample", count=1)) == ["b"]
+
+    # Follow mode: simulate lines being appended, and file being truncated or rotated, while we wait for new lines
+    appended = ["partial", " line\n", "truncate", "after truncation\n", "rotate", "after rotation\n", "delete", "after re-creation\n"]
+
+    def next_append(_):
+        chunk = appended.pop(0)
+        if chunk == "truncate":
+            runez.write("sample", "", logger=None)
+
+        elif chunk == "rotate":
+            # Lines written right before rotation (since last check) are still yielded
+            with open("sample", "a") as fh:
+                fh.write("before rotation\nlast")
+
+            os.rename("sample", "sample.1")
+            runez.write("sample", "", logger=None)
+
+        elif chunk == "delete":
+            runez.delete("sample", logger=None)  # File is moved away, then re-created (on next append)
+
+        else:
+            with open("sample", "a") as fh:
+                fh.write(chunk)
+
+    runez.write("sample", "a\nb\n", logger=None)
+    monkeypatch.setattr(runez.file.time, "sleep", next_append)
+    followed = runez.tail("sample", count=1, follow=True)
+    expected = ["b", "partial line", "after truncation", "before rotation", "last", "after rotation", "after re-creation"]
+    assert [next(followed) for _ in range(7)] == expected
+    followed.close()
+
+
+def test_snapshot(temp_folder, monkeypatch):
+    runez.write("tree/a", "a", logger=None)
+    runez.write("tree/sub/b", "b", logger=None)
+    runez.symlink("tree/a", "tree/link", logger=None)
+    s1 = runez.file.snapshot("tree")
+    assert sorted(s1) == ["a", "link", "sub", "sub/b"]
+    assert s1["a"][0] == 1
+    assert s1["a"][3] is None
+    assert list(runez.file.diff(s1, s1)) == []
+    assert pickle.loads(pickle.dumps(s1)) == s1
+
+    h1 = runez.file.snapshot("tree", hash=hashlib.sha1)
+    assert h1["a"][3] == hashlib.sha1(b"a").hexdigest()
+    assert h1["link"][3] == "a"
+    assert h1["sub"][3] is None
+
+    runez.write("tree/sub/b", "bb", logger=None)
+    runez.write("tree/sub/c", "c", logger=None)
+    runez.delete("tree/link", logger=None)
+    s2 = runez.file.snapshot("tree")
+    expected = [("removed", "link"), ("changed", "sub/b"), ("added", "sub/c")]
+    assert list(runez.file.diff(s1, s2)) == expected
+
+    # Checksums of unchanged files are reused from previous snapshot
+    with monkeypatch.context() as m:
+        m.setattr(runez.file, "checksum", lambda *_, **__: "recomputed")
+        h2 = runez.file.snapshot("tree", hash=hashlib.sha1, previous=h1)
+        assert h2["a"][3] == h1["a"][3]
+        assert h2["sub/b"][3] == "recomputed"
+        assert list(runez.file.diff(h1, h2)) == expected
+
+    h2 = runez.file.snapshot("tree", hash=hashlib.sha1)
+
+    # With checksums, only content (and mode) changes matter
+    os.utime("tree/a", (0, 0))
+    assert list(runez.file.diff(h2, runez.file.snapshot("tree", hash=hashlib.sha1))) == []
+    assert list(runez.file.diff(s2, runez.file.snapshot("tree"))) == [("changed", "a")]
@@ -1,4 +1,6 @@
+import os
 import sys
+import time
 from pathlib import Path
 from typing import NamedTuple
 from unittest.mock import MagicMock, patch
@@ -6,7 +8,7 @@ from unittest.mock import MagicMock, patch
 import pytest
 
 import runez
-from runez.http import ForbiddenHttpError, GlobalHttpCalls, MockResponse, RestClient, RestResponse, urljoin
+from runez.http import CacheJanitor, CacheWrapper, ForbiddenHttpError, GlobalHttpCalls, MockResponse, RestClient, RestResponse, urljoin
 
 EXAMPLE = RestClient("https://example.com")
 
@@ -96,6 +98,48 @@ def test_cache(monkeypatch, logged):
         assert cm.state == CacheState(cached=1, hits=1, misses=3, updates=3)
 
 
+def test_cache_janitor(temp_folder, logged):
+    janitor = CacheJanitor()
+    assert janitor.folder == CacheWrapper.cache_base_path()
+    assert janitor.frequency == 3600
+    assert janitor.size_limit == 2 * 1024**3
+
+    janitor = CacheJanitor("no-such-folder")
+    assert janitor.entries() == []
+    assert janitor.clean() == []
+
+    now = time.time()
+    for i, name in enumerate(("old", "mid", "new")):
+        runez.write(f"cache/{name}/a", "a" * 100, logger=None)
+        runez.write(f"cache/{name}/b", "b" * 100, logger=None)
+        for path in (f"cache/{name}/a", f"cache/{name}/b"):
+            os.utime(path, (now - (3 - i) * 86400, now - (3 - i) * 86400))
+
+    runez.write("cache/single-file", "c" * 50, logger=None)
+    janitor = CacheJanitor("cache", size_limit=None, max_age="10d", logger=print)
+    assert str(janitor) == "CacheJanitor cache"
+    entries = janitor.entries()
+    assert [runez.basename(x.path) for x in entries] == ["old", "mid", "new", "single-file"]
+    assert [x.size for x in entries] == [200, 200, 200, 50]
+    assert str(entries[0]) == "cache/old (200 B)"
+
+    # Nothing to do: everything is younger than 10 days, and there is no size limit
+    assert janitor.clean() == []
+    assert not logged
+
+    janitor.max_age = 2.5 * 86400
+    evicted = janitor.clean(dryrun=True)
+    assert [x.path for x in evicted] == [entries[0].path]
+    assert "Would clean 1 cache entry (200 B) from cache" in logged.pop()
+    assert os.path.isdir("cache/old")
+
+    # Size limit: least recently used entries get evicted first, via heartbeat task
+    janitor.size_limit = 300
+    janitor.execute()
+    assert "Cleaned 2 cache entries (400 B) from cache" in logged.pop()
+    assert sorted(os.listdir("cache")) == ["new", "single-file"]
+
+
 @GlobalHttpCalls.allowed
 def test_decorator_allowed():
     assert GlobalHttpCalls.is_forbidden() is False
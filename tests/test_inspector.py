@@ -60,6 +60,22 @@ def test_auto_import_siblings():
     assert "tests.test_serialize" not in imported
 
 
+def test_bench_command(cli):
+    cli.run("bench", "--time", "0", "--size", "10", "--pythons", "2")
+    assert cli.succeeded
+    assert "| version-parse " in cli.logged
+    assert "| depot-scan " in cli.logged
+
+    cli.run("bench", "-t0", "version-sort")
+    assert cli.succeeded
+    assert "version-sort" in cli.logged
+    assert "version-parse" not in cli.logged
+
+    cli.run("bench", "foo")
+    assert cli.failed
+    assert "Unknown benchmark(s): foo, available: version-parse" in cli.logged
+
+
 def test_diagnostics_command(cli):
     cli.run("--no-color", "diagnostics")
     assert cli.succeeded
@@ -1,6 +1,12 @@
+import asyncio
+import gzip
+import json
 import logging
 import os
+import re
+import signal
 import sys
+import threading
 import time
 from logging.handlers import RotatingFileHandler, TimedRotatingFileHandler
 from unittest.mock import patch
@@ -10,6 +16,7 @@ import pytest
 import runez
 from runez.ascii import AsciiAnimation, AsciiFrames
 from runez.conftest import WrappedHandler
+from runez.heartbeat import Heartbeat
 from runez.logsetup import _formatted_text, formatted, LogSpec
 
 LOG = logging.getLogger(__name__)
@@ -45,6 +52,55 @@ def test_allow_root(temp_log, monkeypatch):
         runez.log.disallow_root_message = prev
 
 
+def test_async_handlers(temp_log):
+    with pytest.raises(ValueError, match="Invalid async backpressure policy 'foo'"):
+        runez.log.setup(async_handlers="foo")
+
+    runez.log.setup(async_handlers=True, console_format="%(context)s%(levelname)s %(message)s", console_level=logging.DEBUG)
+    assert runez.log.async_handler.policy == "block"
+    assert runez.log.async_handler in logging.root.handlers
+    assert runez.log.console_handler not in logging.root.handlers
+    assert runez.log.file_handler not in logging.root.handlers
+
+    # Thread-local context is rendered on caller's thread
+    runez.log.context.add_threadlocal(worker="joe")
+    logging.info("hello")
+    runez.log.flush()
+    assert "[[worker=joe]] INFO hello" in temp_log.stderr.pop()
+    temp_log.expect_logged("INFO hello")
+    runez.log.context.clear_threadlocal()
+
+    # Switching back to synchronous mode re-attaches regular handlers
+    runez.log.setup(async_handlers=False)
+    assert runez.log.async_handler is None
+    assert runez.log.console_handler in logging.root.handlers
+    assert runez.log.file_handler in logging.root.handlers
+
+    # Backpressure: debug records are dropped first when queue is nearly full
+    handler = runez.logsetup._AsyncQueueHandler("drop-debug", 4)
+    for i in range(4):
+        handler.handle(logging.LogRecord("foo", logging.DEBUG, __file__, 1, "debug %s", (i,), None))
+
+    assert handler.queue.qsize() == 3
+    assert handler.dropped == 1
+    handler.handle(logging.LogRecord("foo", logging.INFO, __file__, 1, "info", None, None))
+    assert handler.queue.qsize() == 4
+    assert handler.queue.get().getMessage() == "debug 0"
+
+    handler = runez.logsetup._AsyncQueueHandler("drop", 1)
+    handler.handle(logging.LogRecord("foo", logging.INFO, __file__, 1, "info", None, None))
+    handler.handle(logging.LogRecord("foo", logging.ERROR, __file__, 1, "error", None, None))
+    assert handler.queue.qsize() == 1
+    assert handler.dropped == 1
+
+    # Pending records are emitted when listener is stopped (done at exit)
+    runez.log.setup(async_handlers="drop")
+    logging.warning("pending")
+    runez.log._stop_async_listener()
+    assert runez.log.async_handler is None
+    assert "WARNING pending" in temp_log.stderr.pop()
+
+
 def test_auto_location_not_writable(temp_log):
     with patch("runez.file.os.access", return_value=False):
         runez.log.setup(
@@ -140,6 +196,18 @@ def test_context(temp_log):
     logging.info("hello")
     assert temp_log.pop() == "UTC [[name=foo,version=1.0,worker=susan]] INFO - hello"
 
+    # Rendered context is cached until context gets modified
+    with patch.object(runez.log.context, "to_dict", wraps=runez.log.context.to_dict) as to_dict:
+        logging.info("hello")
+        logging.info("hello")
+        assert to_dict.call_count == 0
+        runez.log.context.add_threadlocal(a="c")
+        logging.info("hello")
+        logging.info("hello")
+        assert to_dict.call_count == 1
+        assert temp_log.pop().splitlines()[-1] == "UTC [[a=c,name=foo,version=1.0,worker=susan]] INFO - hello"
+        runez.log.context.remove_threadlocal("a")
+
     runez.log.context.remove_global("name")
     logging.info("hello")
     assert temp_log.pop() == "UTC [[version=1.0,worker=susan]] INFO - hello"
@@ -167,6 +235,39 @@ def test_context(temp_log):
     assert not runez.log.context.has_threadlocal()
 
 
+def test_context_task_scope(temp_log):
+    runez.log.setup(console_format="%(context)s%(message)s", console_level=logging.INFO, file_format=None)
+    runez.log.context.add_global(v="1")
+    seen = []
+
+    async def handle(name):
+        with runez.log.context.task_scope(req=name):
+            assert runez.log.context.has_task()
+            await asyncio.sleep(0)
+            with runez.log.context.task_scope(step="a"):
+                await asyncio.sleep(0)
+                seen.append(runez.log.context.to_dict())
+                logging.info("hello")
+
+            await asyncio.sleep(0)
+            logging.info("done")
+
+    async def main():
+        await asyncio.gather(handle("r1"), handle("r2"))
+
+    asyncio.run(main())
+    assert not runez.log.context.has_task()
+    assert seen == [{"v": "1", "req": "r1", "step": "a"}, {"v": "1", "req": "r2", "step": "a"}]
+    assert temp_log.stderr.pop().splitlines() == [
+        "[[req=r1,step=a,v=1]] hello",
+        "[[req=r2,step=a,v=1]] hello",
+        "[[req=r1,v=1]] done",
+        "[[req=r2,v=1]] done",
+    ]
+    logging.info("hello")
+    assert temp_log.stderr.pop() == "[[v=1]] hello"
+
+
 def test_convenience(temp_log):
     fmt = "f:%(filename)s mod:%(module)s func:%(funcName)s %(levelname)s %(message)s"
     runez.log.setup(console_format=fmt, console_level=logging.INFO, file_format=None)
@@ -279,6 +380,15 @@ def test_formatted():
     assert formatted("foo %s %s {0}", "bar") == "foo %s %s bar"  # bogus '%s' format
     assert formatted("foo %s %s {0} {1}", "bar") == "foo %s %s {0} {1}"  # bogus '%s' and {positional} format
 
+    # Style of formatting is determined once per message template
+    runez.logsetup._format_style.cache_clear()
+    assert formatted("foo %s", "bar") == "foo bar"
+    assert formatted("foo %s", "baz") == "foo baz"
+    assert formatted("foo bar", "baz") == "foo bar"
+    info = runez.logsetup._format_style.cache_info()
+    assert info.hits == 1
+    assert info.misses == 2
+
 
 def test_formatted_text():
     # Unsupported formats
@@ -315,6 +425,43 @@ def test_formatted_text():
     assert _formatted_text("{a}", cycle, max_depth=3) == "{b}"
 
 
+def test_json_format(temp_log):
+    runez.log.setup(console_format="json", console_level=logging.INFO, file_format="json", greetings=None)
+    assert runez.log.console_handler.formatter._fmt == "json"
+    assert runez.log._is_using_format("context")
+
+    runez.log.context.add_global(version="1.0")
+    logging.info("hello %s", "world")
+    r = json.loads(temp_log.stderr.pop())
+    assert r["level"] == "INFO"
+    assert r["logger"] == "tests.test_logsetup"
+    assert r["message"] == "hello world"
+    assert r["context"] == {"version": "1.0"}
+    assert re.match(r"^\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}[+-]\d{4}$", r["timestamp"])
+
+    runez.log.context.clear_global()
+    logging.getLogger("foo").error("failed", exc_info=(ValueError, ValueError("oops"), None))
+
+    r = json.loads(temp_log.stderr.pop())
+    assert r["logger"] == "foo"
+    assert "context" not in r
+    assert "ValueError: oops" in r["exc_info"]
+    temp_log.expect_logged('"message":"failed"')
+
+    # Exception info remains available to json formatter in async mode
+    runez.log.setup(async_handlers=True)
+    logging.getLogger("foo").error("failed", exc_info=(ValueError, ValueError("oops"), None))
+    runez.log.flush()
+    r = json.loads(temp_log.stderr.pop())
+    assert r["message"] == "failed"
+    assert "ValueError: oops" in r["exc_info"]
+
+    # Switching back to a regular format
+    runez.log.setup(async_handlers=False, console_format="%(levelname)s %(message)s")
+    logging.info("hello")
+    assert temp_log.stderr.pop() == "INFO hello"
+
+
 def test_level(temp_log):
     runez.log.setup(file_format=None, level=logging.INFO)
 
@@ -347,7 +494,7 @@ def test_locations(temp_log):
     assert runez.log.file_handler
 
 
-def test_log_rotate(temp_folder):
+def test_log_rotate(temp_folder, capsys):
     with pytest.raises(ValueError, match="missing kind"):
         runez.log.setup(rotate="foo", tmp=temp_folder)
 
@@ -388,6 +535,61 @@ def test_log_rotate(temp_folder):
     assert h.backupCount == 3
     assert h.maxBytes == 10240
 
+    with pytest.raises(ValueError, match="Invalid 'rotate_compress'"):
+        runez.logsetup._get_file_handler("test.log", "size:10k", 3, compress="foo")
+
+    no_zstd = patch("runez.logsetup._zstandard_module", return_value=None), patch("runez.logsetup._external_compressor", return_value=None)
+    with no_zstd[0], no_zstd[1], pytest.raises(ValueError, match="requires 'zstandard' module or 'zstd' program"):
+        runez.logsetup._get_file_handler("test.log", "size:10k", 3, compress="zst")
+
+    with pytest.raises(ValueError, match="Invalid 'rotate_max_size'"):
+        runez.logsetup._get_file_handler("test.log", "size:10k", 3, max_size="foo")
+
+    h = runez.logsetup._get_file_handler("test.log", "time:midnight+size:1k", 3)
+    assert h.when == "midnight"
+    assert h.max_bytes == 1024
+    assert h.rollover_at > time.time()
+    h.close()
+
+    # Hybrid rotation, with compression and retention
+    h = runez.logsetup._get_file_handler("test.log", "time:1h+size:100", 2, compress="gz", max_size="10k")
+    h.setFormatter(logging.Formatter("%(message)s"))
+    assert h.interval == 3600
+    for i in range(12):
+        h.handle(logging.LogRecord("foo", logging.INFO, __file__, 1, "line %s: %s", (i, "x" * 40), None))
+
+    h.rollover_at = time.time() - 1  # Time-based rotation kicks in too
+    h.handle(logging.LogRecord("foo", logging.INFO, __file__, 1, "last line", None, None))
+    h.close()
+    backups = h.backups()
+    assert len(backups) == 2  # Older backups were deleted, as per 'rotate_count'
+    assert all(x.endswith(".gz") for x in backups)
+    assert not any(os.path.exists(x[:-3]) for x in backups)
+    with gzip.open(backups[0], "rt") as fh:
+        assert fh.read().startswith("line 11: ")
+
+    assert list(runez.readlines("test.log")) == ["last line"]
+
+    # Retention by total size
+    h = runez.logsetup._get_file_handler("other.log", "size:100", 0, max_size=400)
+    h.setFormatter(logging.Formatter("%(message)s"))
+    for i in range(30):
+        h.handle(logging.LogRecord("foo", logging.INFO, __file__, 1, "line %s: %s", (i, "x" * 40), None))
+
+    h.close()
+    assert sum(os.path.getsize(x) for x in h.backups()) <= 400
+    assert len(h.backups()) == 8
+
+    # Failures in background thread are reported on stderr
+    h = runez.logsetup._get_file_handler("failed.log", "size:100", 2, compress="gz")
+    with patch("runez.logsetup._compressed_log_file", side_effect=OSError("oops")):
+        h._groom("failed.log.1")
+
+    h.close()
+    err = capsys.readouterr().err
+    assert "Logging error while grooming rotated log file failed.log.1" in err
+    assert "OSError: oops" in err
+
 
 def test_logspec():
     s1 = LogSpec(runez.log._default_spec, appname="pytest")
@@ -448,6 +650,128 @@ def test_no_context(temp_log):
     temp_log.expect_logged("[MainThread] INFO - hello")
 
 
+def test_rate_limit(temp_log):
+    with pytest.raises(ValueError, match="Invalid 'rate_limit'"):
+        runez.log.setup(rate_limit="foo")
+
+    with pytest.raises(ValueError, match="Invalid 'sample_debug'"):
+        runez.log.setup(rate_limit=None, sample_debug=2)
+
+    runez.log.setup(console_level=logging.DEBUG, rate_limit="2/1m", sample_debug=0, greetings=None)
+    assert len(runez.log.console_handler.filters) == 2
+    assert runez.log.file_handler.filters == runez.log.console_handler.filters
+    for i in range(5):
+        logging.warning("hello %s", i)
+        logging.debug("some debug chatter")
+
+    logging.info("other")
+    assert temp_log.stderr.pop().splitlines() == ["WARNING hello 0", "WARNING hello 1", "INFO other"]
+    temp_log.expect_logged("WARNING hello 1", "INFO other")
+    with open(runez.log.file_handler.baseFilename) as fh:
+        assert len(fh.readlines()) == 3  # Records are counted once, even though they're seen by 2 handlers
+
+    # Summary of suppressed messages is logged once interval elapses
+    rate_limiter = runez.log._log_filters[-1]
+    rate_limiter._next_sweep -= 61
+    for site in rate_limiter._sites.values():
+        site[0] -= 61
+
+    logging.warning("hello %s", 5)
+
+    assert temp_log.stderr.pop().splitlines() == ["WARNING Suppressed 3 similar messages: hello %s", "WARNING hello 5"]
+
+    # Messages don't have to be hashable
+    for _ in range(3):
+        logging.warning({"a": [1]})
+
+    assert temp_log.stderr.pop().splitlines() == ["WARNING {'a': [1]}", "WARNING {'a': [1]}"]
+
+    # Pending summaries of call sites that went quiet are emitted when logging is re-configured
+    with patch.object(runez.log, "_log_filters_atexit", False), patch("runez.logsetup.atexit.register") as register:
+        runez.log.setup(rate_limit="1/1s", sample_debug=0)
+        assert register.call_args[0] == (runez.log._flush_log_filters,)  # Pending summaries are flushed at exit too
+
+    assert temp_log.stderr.pop().splitlines() == ["WARNING Suppressed 1 similar messages: {'a': [1]}"]
+
+    # Flood followed by silence: summary is emitted in the background
+    sweeper = runez.log._rate_limit_sweeper
+    assert sweeper in Heartbeat.tasks
+    for i in range(3):
+        logging.warning("flood %s", i)
+
+    assert temp_log.stderr.pop() == "WARNING flood 0"
+    for _ in range(50):
+        time.sleep(0.1)
+        if temp_log.stderr:
+            break
+
+    assert temp_log.stderr.pop() == "WARNING Suppressed 2 similar messages: flood %s"
+
+    # Sampling
+    runez.log.setup(rate_limit=None, sample_debug=1)
+    assert len(runez.log.console_handler.filters) == 1
+    logging.debug("some debug chatter")
+    assert temp_log.stderr.pop() == "DEBUG some debug chatter"
+
+    runez.log.setup(sample_debug=None)
+    assert not runez.log.console_handler.filters
+    assert runez.log._rate_limit_sweeper is None
+    assert sweeper not in Heartbeat.tasks
+
+
+def test_sampling_profiler(temp_log):
+    # No file logging setup yet: nothing to do
+    runez.log.enable_sampling_profiler()
+    assert runez.log.profiler_signum is None
+
+    runez.log.setup(console_level=logging.DEBUG)
+    runez.log.enable_sampling_profiler(duration=0.2, rate=50)
+    assert runez.log.profiler_signum == signal.SIGUSR2
+
+    os.kill(os.getpid(), signal.SIGUSR2)
+    profiler = runez.log._profiler
+    assert profiler.is_alive()
+    os.kill(os.getpid(), signal.SIGUSR2)  # Ignored while profiler is running
+    assert runez.log._profiler is profiler
+    profiler.join()
+
+    prefix = "%s.%s." % (os.path.splitext(runez.log.file_handler.baseFilename)[0], os.getpid())
+    assert profiler.path.startswith(prefix)
+    assert profiler.path.endswith(".collapsed")
+    assert "Sampling profile written to " in temp_log.stderr.pop()
+    lines = list(runez.readlines(profiler.path))
+    assert any(line.startswith("MainThread;") and "test_sampling_profiler" in line for line in lines)
+    assert all(line.rpartition(" ")[2].isdigit() for line in lines)
+    runez.delete(profiler.path, logger=None)
+
+    runez.log.enable_sampling_profiler(signum=None)
+    assert runez.log.profiler_signum is None
+    assert signal.getsignal(signal.SIGUSR2) is signal.SIG_DFL
+
+    # Previously installed signal handler is restored when profiler gets disabled
+    def custom_handler(*_):
+        pass
+
+    signal.signal(signal.SIGUSR2, custom_handler)
+    try:
+        runez.log.enable_sampling_profiler(duration=30)
+        runez.log.enable_sampling_profiler(duration=30)  # Re-enabling doesn't lose track of original handler
+        assert signal.getsignal(signal.SIGUSR2) is not custom_handler
+
+        # Profiler still running at reset is cancelled, and doesn't write any file
+        os.kill(os.getpid(), signal.SIGUSR2)
+        profiler = runez.log._profiler
+        assert profiler.is_alive()
+        runez.log.reset()
+        assert not profiler.is_alive()
+        assert not os.path.exists(profiler.path)
+        assert runez.log._profiler is None
+        assert signal.getsignal(signal.SIGUSR2) is custom_handler
+
+    finally:
+        signal.signal(signal.SIGUSR2, signal.SIG_DFL)
+
+
 def test_setup(temp_log, monkeypatch):
     # signum=None is equivalent to disabling faulthandler
     runez.log.enable_faulthandler(signum=None)
@@ -469,6 +793,10 @@ def test_setup(temp_log, monkeypatch):
         assert runez.DRYRUN
         logging.info("info")
         logging.debug("hello")
+        with patch("runez.logsetup.formatted") as formatted_call:
+            runez.log.trace("some trace %s", "info")
+            assert not formatted_call.called  # No formatting when tracing is disabled
+
         runez.log.trace("some trace info")
         assert not temp_log.stdout
         assert "hello" not in temp_log
@@ -612,6 +940,78 @@ def test_progress_grooming():
     assert next_progress_line(p) == " a b"
 
 
+def test_progress_redraw():
+    p = runez.logsetup.ProgressSpinner()
+    p._state = runez.logsetup._SpinnerState(p, AsciiFrames(None), 80, None, None, None)
+    assert next_progress_line(p) is None
+    assert p._state.next_deadline(False) is None  # Not animated: wake up only when notified
+    assert p._state.next_deadline(True) == p._state.message.next_update
+
+    # Notifications are a no-op when spinner is not running
+    p.show("hello")
+    assert not p._wakeup.is_set()
+
+    p.is_running = True
+    bar = runez.ProgressBar(total=3)
+    bar.parent = None
+    p._add_progress_bar(bar)
+    assert p._wakeup.is_set()
+
+    p._wakeup.clear()
+    with patch.object(runez.log, "progress", p):
+        bar.update()
+        assert p._wakeup.is_set()
+
+    assert next_progress_line(p) == " ▉▉▍     33% hello"
+
+    p._state = runez.logsetup._SpinnerState(p, AsciiFrames("ab", fps=10), 80, None, None, None)
+    ts = time.time()
+    p._state.get_line(ts)
+    assert p._state.next_deadline(False) == ts + 0.1  # Animated: wake up for next frame
+
+    # Progress line is not drawn over a partially written line, and is redrawn once that line is completed
+    p = runez.logsetup.ProgressSpinner()
+    p._state = runez.logsetup._SpinnerState(p, AsciiFrames(None), 80, None, None, None)
+    p._state.next_deadline = lambda _: 0  # Deadline already passed: must not busy-loop
+    get_line = p._state.get_line
+    calls = []
+    p._state.get_line = lambda ts: calls.append(ts) or get_line(ts)
+    stderr = []
+    p._stderr_write = stderr.append
+    p.show("working")
+    p.is_running = True
+    p._thread = threading.Thread(target=p._run, daemon=True)
+    p._thread.start()
+
+    def wait_for(predicate):
+        for _ in range(100):
+            if predicate():
+                return True
+
+            time.sleep(0.01)
+
+    assert wait_for(lambda: p._has_progress_line is True)
+    assert stderr[-2:] == [" working", "\r"]
+
+    output = []
+    stderr.clear()
+    p._clean_write(output.append, "partial")
+    assert p._has_progress_line is False
+    time.sleep(0.1)
+    assert stderr == ["\r\033[K"]  # Progress line cleared, not redrawn over partial line
+    assert len(calls) < 50  # Not busy-looping on passed deadline
+
+    p._clean_write(output.append, " line\n")
+    assert wait_for(lambda: p._has_progress_line is True)  # Redrawn (even though its text didn't change)
+    assert stderr[-2:] == [" working", "\r"]
+    assert output == ["partial", " line\n"]
+
+    thread = p._thread
+    p._thread = None
+    p._wakeup.set()
+    thread.join()
+
+
 def test_progress_operation(temp_log):
     assert not runez.log.progress.is_running
     runez.log.progress.start()
@@ -719,6 +1119,70 @@ def sample_function2(message):
     print(message)
 
 
+@runez.log.timeit(aggregate=True)
+def sample_function3(fail=False):
+    if fail:
+        raise ValueError("oops")
+
+
+def test_timeit_aggregate(logged, monkeypatch):
+    monkeypatch.setattr(runez.log.timeit, "_stats", {})
+    assert runez.log.timeit.report() is None
+    for _ in range(20):
+        sample_function3()
+
+    with pytest.raises(ValueError, match="oops"):
+        sample_function3(fail=True)
+
+    with runez.log.timeit("section", aggregate=True):
+        pass
+
+    runez.log.timeit.record("other", 2000)
+    runez.log.timeit.record("other", 1000)
+    assert not logged  # Calls are not logged individually
+
+    stats = runez.log.timeit._stats
+    assert stats["sample_function3()"].count == 21
+    assert stats["section"].count == 1
+    other = stats["other"]
+    assert other.total_ns == 3000
+    assert other.min_ns == 1000
+    assert other.max_ns == 2000
+    assert 1000 <= other.percentile(50) < 1100  # Percentiles are estimated with ~9% precision
+    assert 1900 < other.percentile(99) <= 2000
+
+    table = str(runez.log.timeit.report(reset=True))
+    assert "Function" in table
+    assert "p95" in table
+    assert "sample_function3()" in table
+    assert " 21 " in table
+    assert runez.log.timeit.report() is None
+
+    # Report can be logged at exit, or on demand via a signal
+    with patch("runez.logsetup.atexit.register") as register, patch("runez.logsetup.signal.signal") as handler:
+        runez.log.timeit.report_on(signum=signal.SIGUSR2, logger=print)
+        log_report = register.call_args[0][0]
+        signum, on_signal = handler.call_args[0]
+        assert signum == signal.SIGUSR2
+
+    log_report()
+    assert not logged
+
+    runez.log.timeit.record("other", 1000)
+    log_report()
+    assert "Timings:" in logged.pop()
+
+    # Signal handler doesn't report directly (it could deadlock on `_stats_lock`), it delegates to a thread
+    runez.log.timeit.record("other", 1000)
+    with runez.log.timeit._stats_lock:
+        on_signal(signal.SIGUSR2, None)
+        assert not logged
+
+    reporter = next(t for t in threading.enumerate() if t.name == "runez-timings-report")
+    reporter.join()
+    assert "Timings:" in logged.pop()
+
+
 def test_timeit(logged):
     sample = SampleClass()
     sample.instance_func1("hello")
@@ -1,12 +1,24 @@
+import copy
 import json
 import os
+import pickle
 import sys
 
 import pytest
 
 import runez
 from runez.http import RestClient
-from runez.pyenv import ArtifactInfo, PypiStd, PythonDepot, PythonInstallation, PythonSpec, Version
+from runez.pyenv import (
+    ArtifactInfo,
+    PypiSimpleIndex,
+    PypiStd,
+    PythonDepot,
+    PythonInstallation,
+    PythonSimpleInspection,
+    PythonSpec,
+    Version,
+    VersionSpecifier,
+)
 
 PYPI_CLIENT = RestClient("https://example.com/pypi")
 
@@ -42,6 +54,21 @@ def test_artifact_info():
     with pytest.raises(TypeError):
         _ = info1 < "None"
 
+    # Name standardization is memoized
+    hits = PypiStd._std_package_name.cache_info().hits
+    info3 = ArtifactInfo.from_basename("E.S.P.-Hadouken-0.2.2.tar.gz")
+    assert not hasattr(info3, "__dict__")
+    assert PypiStd._std_package_name.cache_info().hits == hits + 1
+    assert info3.relative_url == "e-s-p-hadouken/E.S.P.-Hadouken-0.2.2.tar.gz"
+
+    # Pickle and deepcopy round-trip
+    info4 = ArtifactInfo.from_basename("Foo.Bar-1.0.tar.gz")
+    for clone in (pickle.loads(pickle.dumps(info4)), copy.deepcopy(info4)):
+        assert clone == info4
+        assert clone.pypi_name == "foo-bar"
+        assert clone.relative_url == "foo-bar/Foo.Bar-1.0.tar.gz"
+        assert clone.version == "1.0"
+
 
 def mk_python(basename, executable=True, content=None, machine=None):
     if basename[0].isdigit():
@@ -166,6 +193,57 @@ def test_depot_adhoc(temp_folder):
     assert str(depot.find_python("some-path/bin")) == "some-path/bin [13.1.2]"
 
 
+def bump_mtime(path):
+    # Filesystem timestamps can be coarse, ensure modification is seen even if it happened within the same tick
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_depot_refresh(temp_folder, monkeypatch):
+    mk_python("8.5.1")
+    mk_python("8.6.1")
+    monkeypatch.setattr(PythonSimpleInspection, "_cached", {})
+    spawned = []
+    original = PythonSimpleInspection._spawned_inspection
+
+    def tracked_inspection(real_exe):
+        spawned.append(real_exe.parent.parent.name)
+        return original(real_exe)
+
+    monkeypatch.setattr(PythonSimpleInspection, "_spawned_inspection", tracked_inspection)
+    depot = PythonDepot(".pyenv/versions/**", "other")
+    assert [str(p.full_version) for p in depot.available_pythons] == ["8.6.1", "8.5.1"]
+    assert depot.refresh() == []  # Nothing changed
+
+    # Newly installed python shows up, previously inspected pythons are not re-inspected
+    spawned.clear()
+    mk_python("8.7.1")
+    bump_mtime(".pyenv/versions")
+    assert [str(x) for x in depot.refresh()] == [".pyenv/versions/**"]
+    assert [str(p.full_version) for p in depot.available_pythons] == ["8.7.1", "8.6.1", "8.5.1"]
+    assert spawned == ["8.7.1"]
+
+    # Python modified in place gets re-inspected, removed python disappears
+    spawned.clear()
+    mk_python("8.6.1", content={"version": "8.6.2", "machine": "x86_64", "freethreading": False})
+    bump_mtime(".pyenv/versions/8.6.1/bin")
+    runez.delete(".pyenv/versions/8.5.1", logger=None)
+    bump_mtime(".pyenv/versions")
+    assert len(depot.refresh()) == 1
+    assert [str(p.full_version) for p in depot.available_pythons] == ["8.7.1", "8.6.2"]
+    assert spawned == ["8.6.1"]
+
+    # Changes are picked up on access, with a `refresh_interval`
+    depot = PythonDepot(".pyenv/versions/**", refresh_interval=10)
+    assert len(depot.available_pythons) == 2
+    runez.delete(".pyenv/versions/8.7.1", logger=None)
+    bump_mtime(".pyenv/versions")
+    assert len(depot.available_pythons) == 2  # Not checked yet
+    monkeypatch.setattr(depot, "_next_refresh", 0)
+    assert [str(p.full_version) for p in depot.available_pythons] == ["8.6.2"]
+    assert str(depot.find_python("8.6")) == ".pyenv/versions/8.6.1 [8.6.2]"
+
+
 def test_depot_folder(temp_folder):
     mk_python("8.5.6")
     mk_python("8.5.7")
@@ -183,6 +261,53 @@ def test_depot_folder(temp_folder):
     assert str(depot.find_python("8.5.7")) == "8.5.7 [not available]"
 
 
+def test_depot_lazy_find(temp_folder, monkeypatch):
+    mk_python("8.5.1")
+    mk_python("8.6.1")
+    mk_python("8.6.2", content="failed")
+    mk_python("8.7.1")
+    monkeypatch.setattr(PythonSimpleInspection, "_cached", {})
+    spawned = []
+    original = PythonSimpleInspection._spawned_inspection
+
+    def tracked_inspection(real_exe):
+        spawned.append(real_exe.parent.parent.name)
+        return original(real_exe)
+
+    monkeypatch.setattr(PythonSimpleInspection, "_spawned_inspection", tracked_inspection)
+    depot = PythonDepot(".pyenv/versions/**")
+    assert str(depot.find_python("8.6")) == ".pyenv/versions/8.6.1"
+    assert spawned == ["8.6.2", "8.6.1"]  # Only candidates that could satisfy the spec get inspected, best ones first
+    assert str(depot.find_python("8.5+")) == ".pyenv/versions/8.7.1"
+    assert str(depot.find_python("8.5.1")) == ".pyenv/versions/8.5.1"
+    assert depot.find_python("8.8").problem == "not available"
+    assert spawned == ["8.6.2", "8.6.1", "8.7.1", "8.5.1"]
+
+    # Pythons found lazily get re-inspected by `refresh()` when modified in place
+    assert depot.refresh() == []
+    mk_python("8.7.1", machine="arm64")
+    bump_mtime(".pyenv/versions/8.7.1/bin")
+    assert len(depot.refresh()) == 1
+    assert depot.find_python("8.7").machine == "arm64"
+    assert spawned[4:] == ["8.7.1"]
+
+    # Misleading file names: fall back to inspecting all candidates
+    mk_python("8.9.1", content={"version": "8.4.1", "machine": "x86_64", "freethreading": False})
+    depot = PythonDepot(".pyenv/versions/**")
+    assert depot.find_python("8.9").problem == "not available"
+    assert spawned[5:] == ["8.9.1"]  # Others were already inspected
+    assert len(depot.available_pythons) == 4
+    assert str(depot.find_python("8.4")) == ".pyenv/versions/8.9.1 [8.4.1]"
+
+    # Names that are not plain versions are not used as hints
+    mk_python("pyston-2.3.5/8.3.12")
+    mk_python("graalpy-23.1.0/8.2.3")
+    depot = PythonDepot(".pyenv/versions/**")
+    assert str(depot.find_python("8.3")) == ".pyenv/versions/pyston-2.3.5 [8.3.12]"
+    depot = PythonDepot(".pyenv/versions/**")
+    assert str(depot.find_python("8.2")) == ".pyenv/versions/graalpy-23.1.0 [8.2.3]"
+
+
 def test_depot_path():
     depot = PythonDepot("PATH")
     assert depot.available_pythons
@@ -254,6 +379,134 @@ def test_inspect_is_ascii_only():
     assert src_bytes.decode("ascii") == src_text  # raises UnicodeDecodeError if any non-ASCII byte sneaks in
 
 
+def test_inspection_layout(temp_folder, monkeypatch):
+    monkeypatch.setattr(PythonSimpleInspection, "_cached", {})
+    monkeypatch.setattr(PythonSimpleInspection, "_spawned_inspection", None)  # Layout alone must be conclusive here
+    elf = b"\x7fELF\x02\x01\x01" + bytes(11) + (0xB7).to_bytes(2, "little")
+    for basename in ("python8.6", "python8.7t"):
+        runez.write(f"8/bin/{basename}", elf, logger=None)
+        runez.make_executable(f"8/bin/{basename}", logger=None)
+
+    runez.write("8/include/python8.6/patchlevel.h", '#define PY_MAJOR_VERSION 8\n#define PY_VERSION "8.6.1rc1+"\n', logger=None)
+    runez.write("8/include/python8.7t/patchlevel.h", '#define PY_VERSION "8.7.2"\n', logger=None)
+    python = PythonInstallation(runez.to_path("8/bin/python8.6").absolute())
+    assert python.full_version == "8.6.1"
+    assert python.machine == "aarch64"
+    assert not python.inspection.freethreading
+    python = PythonInstallation(runez.to_path("8/bin/python8.7t").absolute())
+    assert python.full_version == "8.7.2"
+    assert python.inspection.freethreading
+
+    # Not conclusive: fall back to spawning a python process
+    layout = PythonSimpleInspection.layout_inspection
+    runez.write("8/bin/python8.8", elf, logger=None)
+    assert layout(runez.to_path("8/bin/python8.8")) is None  # No include/ header
+    runez.write("8/include/python8.8/patchlevel.h", '#define PY_VERSION "8.9.0"\n', logger=None)
+    assert layout(runez.to_path("8/bin/python8.8")) is None  # Header doesn't match exe name
+    runez.write("8/include/python8.8/patchlevel.h", '#define PY_VERSION "8.8.0"\n', logger=None)
+    runez.write("8/bin/python8.8", b"#!/bin/sh\n", logger=None)
+    assert layout(runez.to_path("8/bin/python8.8")) is None  # Not a binary
+    runez.write("8/bin/python8.8", elf[:18] + (0x28).to_bytes(2, "little"), logger=None)
+    assert layout(runez.to_path("8/bin/python8.8")) is None  # Unknown architecture
+    assert layout(runez.to_path("8/bin/python8")) is None  # Name is not precise enough
+
+    # Mach-O binaries
+    runez.write("8/bin/python8.8", b"\xcf\xfa\xed\xfe" + (0x0100000C).to_bytes(4, "little"), logger=None)
+    assert layout(runez.to_path("8/bin/python8.8")).machine == "arm64"
+    fat = b"\xca\xfe\xba\xbe" + (2).to_bytes(4, "big")
+    for cputype in (0x01000007, 0x0100000C):
+        fat += cputype.to_bytes(4, "big") + bytes(16)
+
+    runez.write("8/bin/python8.8", fat, logger=None)
+    monkeypatch.setattr("platform.machine", lambda: "arm64")
+    assert layout(runez.to_path("8/bin/python8.8")).machine == "arm64"
+    monkeypatch.setattr("platform.machine", lambda: "ppc")
+    assert layout(runez.to_path("8/bin/python8.8")) is None
+
+
+def test_inspection_layout_matches_spawned():
+    real_exe = runez.to_path(sys.executable).resolve()
+    layout = PythonSimpleInspection.layout_inspection(real_exe)
+    if layout is not None:
+        assert layout.to_dict() == PythonSimpleInspection._spawned_inspection(real_exe).to_dict()
+
+
+def test_inspection_persisted(temp_folder, monkeypatch):
+    assert PythonSimpleInspection.resolved_cache_path() is None  # Disabled by default in tests
+    monkeypatch.setattr(PythonSimpleInspection, "cache_path", "inspections.json")
+    monkeypatch.setattr(PythonSimpleInspection, "_cached", {})
+    monkeypatch.setattr(PythonSimpleInspection, "_persisted", None)
+    monkeypatch.setattr(PythonSimpleInspection, "_persisted_path", None)
+    monkeypatch.setattr(PythonSimpleInspection, "_persisted_atexit", True)
+    mk_python("8.6.1")
+    mk_python("8.7.2", content="failed")
+    exe = runez.to_path(".pyenv/versions/8.6.1/bin/python8.6").absolute()
+    failed = runez.to_path(".pyenv/versions/8.7.2/bin/python8.7").absolute()
+    assert PythonInstallation(exe).full_version == "8.6.1"
+    assert PythonInstallation(failed).problem == "failed"
+    assert not os.path.exists("inspections.json")  # Saved once per prefetch, or at exit
+    PythonSimpleInspection.save_persisted()
+    persisted = runez.read_json("inspections.json")
+    assert list(persisted) == [str(exe)]  # Inspections with problems are not persisted
+    assert persisted[str(exe)]["version"] == "8.6.1"
+
+    # Simulate a new process: inspection is found in persisted cache, no python process is spawned
+    monkeypatch.setattr(PythonSimpleInspection, "_cached", {})
+    monkeypatch.setattr(PythonSimpleInspection, "_persisted", None)
+    with monkeypatch.context() as m:
+        m.setattr(PythonSimpleInspection, "_spawned_inspection", None)
+        assert PythonInstallation(exe).full_version == "8.6.1"
+
+    # Modified python exe gets re-inspected
+    monkeypatch.setattr(PythonSimpleInspection, "_cached", {})
+    mk_python("8.6.1", content={"version": "8.6.2", "machine": "x86_64", "freethreading": False})
+    assert PythonInstallation(exe).full_version == "8.6.2"
+    PythonSimpleInspection.save_persisted()
+    assert runez.read_json("inspections.json")[str(exe)]["version"] == "8.6.2"
+
+    # Deleted pythons are eventually cleaned up from persisted cache
+    runez.delete(".pyenv/versions/8.6.1", logger=None)
+    mk_python("8.8.1")
+    exe = runez.to_path(".pyenv/versions/8.8.1/bin/python8.8").absolute()
+    assert PythonInstallation(exe).full_version == "8.8.1"
+    PythonSimpleInspection.save_persisted()
+    assert list(runez.read_json("inspections.json")) == [str(exe)]
+
+    # Concurrent inspections are saved once, when prefetch completes
+    saved = []
+    monkeypatch.setattr(runez, "save_json", lambda data, *_, **__: saved.append(sorted(data)))
+    mk_python("8.9.1")
+    mk_python("8.9.2")
+    new_exes = [runez.to_path(".pyenv/versions/%s/bin/python8.9" % v).absolute() for v in ("8.9.1", "8.9.2")]
+    PythonSimpleInspection.prefetch(new_exes)
+    assert saved == [sorted([str(exe), *(str(x) for x in new_exes)])]
+    PythonSimpleInspection.save_persisted()
+    assert len(saved) == 1  # Nothing new to save
+
+
+def test_inspection_prefetch(temp_folder, monkeypatch):
+    mk_python("8.5.1")
+    mk_python("8.6.1")
+    mk_python("8.7.1", content="failed")
+    runez.symlink(".pyenv/versions/8.6.1/bin/python8.6", ".pyenv/versions/8.6.1/bin/python3", logger=None)
+    monkeypatch.setattr(PythonSimpleInspection, "_cached", {})
+    spawned = []
+    original = PythonSimpleInspection._spawned_inspection
+
+    def tracked_inspection(real_exe):
+        spawned.append(real_exe.name)
+        return original(real_exe)
+
+    monkeypatch.setattr(PythonSimpleInspection, "_spawned_inspection", tracked_inspection)
+    depot = PythonDepot(".pyenv/versions/**")
+    assert [str(p.full_version) for p in depot.available_pythons] == ["8.6.1", "8.5.1"]
+    assert sorted(spawned) == ["python8.5", "python8.6", "python8.7"]  # Each python inspected only once
+
+    # Symlinks to already inspected pythons don't get re-inspected
+    PythonSimpleInspection.prefetch(runez.to_path(".pyenv/versions").glob("*/bin/python*"))
+    assert len(spawned) == 3
+
+
 def test_invoker():
     import runez.pyenv
 
@@ -264,6 +517,69 @@ def test_invoker():
     assert invoker.problem is None
 
 
+SIMPLE_HTML = """<!DOCTYPE html><html><body><h1>Links for foo</h1>
+<a href="../../packages/foo-1.0.tar.gz#sha256=ab12" data-requires-python="&gt;=3.8">foo-1.0.tar.gz</a><br/>
+<a href="../../packages/foo-1.0.win32.exe">foo-1.0.win32.exe</a><br/>
+<a href="../../packages/UNKNOWN-1.1.tar.gz">UNKNOWN-1.1.tar.gz</a><br/>
+<a href="../../packages/foo-1.1-py3-none-any.whl#sha256=cd34">foo-1.1-py3-none-any.whl</a><br/>
+</body></html>"""
+
+SIMPLE_JSON = {
+    "meta": {"api-version": "1.1", "_last-serial": 123, "note": 'tricky \\"] } [{\\', "flag": True, "none": None},
+    "name": "foo",
+    "serial": 123,
+    "files": [
+        {"filename": "foo-1.0.tar.gz", "hashes": {"sha256": "ab12"}, "size": 12, "upload-time": "2024-01-02T03:04:05.123456Z"},
+        {"filename": "foo-1.0.win32.exe", "hashes": {}},
+        {"filename": "foo-1.1-py3-none-any.whl", "hashes": {"sha256": "cd34"}, "size": 3456},
+    ],
+    "versions": ["1.0", "1.1"],
+}
+
+
+@PYPI_CLIENT.mock({"simple/foo/": SIMPLE_JSON, "simple/bar/": SIMPLE_HTML})
+def test_pypi_simple_index(temp_folder):
+    # Content received in small chunks yields the same artifacts
+    text = json.dumps(SIMPLE_JSON, indent=1)
+    for size in (1, 7, len(text)):
+        artifacts = list(PypiSimpleIndex.artifacts(text[i : i + size].encode() for i in range(0, len(text), size)))
+        assert [str(x) for x in artifacts] == ["foo/foo-1.0.tar.gz", "foo/foo-1.1-py3-none-any.whl"]
+        assert [x.hashes for x in artifacts] == [{"sha256": "ab12"}, {"sha256": "cd34"}]
+        assert [x.size for x in artifacts] == [12, 3456]
+        assert artifacts[0].last_modified.isoformat() == "2024-01-02T03:04:05.123456+00:00"
+        assert artifacts[1].last_modified is None
+
+    # Large values other than 'files' are skipped as they stream by, without being buffered
+    big = dict(SIMPLE_JSON, versions=["1.%s" % i for i in range(2000)])
+    text = json.dumps(big)
+    index = PypiSimpleIndex()
+    artifacts = []
+    for i in range(0, len(text), 50):
+        artifacts.extend(index.feed(text[i : i + 50]))
+        assert len(index._parser._buffer) < 200
+
+    artifacts.extend(index.close())
+    assert [str(x) for x in artifacts] == ["foo/foo-1.0.tar.gz", "foo/foo-1.1-py3-none-any.whl"]
+
+    response = PYPI_CLIENT.get_response("simple/bar/")
+    artifacts = list(PypiSimpleIndex.artifacts(response))
+    assert [str(x) for x in artifacts] == ["foo/foo-1.0.tar.gz", "foo/foo-1.1-py3-none-any.whl"]
+    assert artifacts[0].source == "https://example.com/pypi/simple/bar/"
+    assert [x.hashes for x in artifacts] == [{"sha256": "ab12"}, {"sha256": "cd34"}]
+
+    runez.write("index.html", SIMPLE_HTML, logger=None)
+    artifacts = list(PypiSimpleIndex.artifacts("index.html", chunk_size=16))
+    assert [str(x) for x in artifacts] == ["foo/foo-1.0.tar.gz", "foo/foo-1.1-py3-none-any.whl"]
+    assert artifacts[0].source == "index.html"
+
+    assert not list(PypiSimpleIndex.artifacts(["", " "]))
+    with pytest.raises(ValueError, match="Truncated"):
+        list(PypiSimpleIndex.artifacts([text[:-10]]))
+
+    with pytest.raises(ValueError, match="expecting ':'"):
+        list(PypiSimpleIndex.artifacts(['{"files" ]']))
+
+
 def test_pypi_standardized_naming():
     assert not PypiStd.is_acceptable(None)
     assert not PypiStd.is_acceptable(1)
@@ -833,6 +1149,76 @@ def test_version_ordering():
     )
 
 
+def test_version_parsed():
+    v = Version.parsed("1.2.3rc1")
+    assert v is Version.parsed("1.2.3rc1")  # Interned
+    assert v is not Version.parsed("1.2.3rc1", canonical=True)
+    assert v == Version("1.2.3rc1")
+    assert not v.__dict__  # Only cached properties go to __dict__
+    assert v.mm == "1.2"
+
+    # Sort key is consistent with comparison operators
+    versions = [Version(x) for x in ("1.0", "1.0+5", "1.0+abc", "1.0rc1", "1!0.1", "1.2.3.4.5.6", "foo")]
+    assert sorted(versions) == sorted(versions, key=lambda x: x.sort_key)
+    assert [str(x) for x in sorted(versions, key=lambda x: x.sort_key)] == [
+        "1.2.3.4.5.6",
+        "foo",
+        "1.0rc1",
+        "1.0",
+        "1.0+abc",
+        "1.0+5",
+        "1!0.1",
+    ]
+
+
+def test_version_specifier():
+    versions = sorted(Version(x) for x in ("1.0", "3.8.1", "3.10.1", "3.10.2", "3.12.9", "3.12.10+local", "3.13.0rc1", "3.13.0"))
+    spec = VersionSpecifier(">=3.8, <3.13,!=3.10.2")
+    assert str(spec) == ">=3.8, <3.13,!=3.10.2"
+    assert "3.10.1" in spec
+    assert "3.10.2" not in spec
+    assert "3.13.0rc1" not in spec  # Pre-releases of upper bound are not accepted
+    assert [str(x) for x in spec.filtered(versions)] == ["3.8.1", "3.10.1", "3.12.9", "3.12.10+local"]
+    assert list(spec.filtered(versions, presorted=True)) == list(spec.filtered(versions))
+    assert str(spec.highest(versions)) == "3.12.10+local"
+    assert spec.highest(versions, presorted=True) is spec.highest(versions)
+
+    # Pre-releases are accepted only when explicitly mentioned (or requested)
+    assert str(VersionSpecifier(">3.12").highest(versions)) == "3.13.0"
+    assert str(VersionSpecifier(">3.12", prereleases=True).highest(versions[:-1])) == "3.13.0rc1"
+    assert str(VersionSpecifier(">=3.13.0rc1").highest(versions[:-1], presorted=True)) == "3.13.0rc1"
+    assert VersionSpecifier(">3.13").highest(versions) is None
+    assert VersionSpecifier(">3.13").highest(versions, presorted=True) is None
+
+    # Wildcards, compatible release, local versions, post-releases
+    assert [str(x) for x in VersionSpecifier("==3.10.*").filtered(versions)] == ["3.10.1", "3.10.2"]
+    assert [str(x) for x in VersionSpecifier("!=3.*").filtered(versions)] == ["1.0"]
+    assert [str(x) for x in VersionSpecifier("~=3.10").filtered(versions)] == ["3.10.1", "3.10.2", "3.12.9", "3.12.10+local", "3.13.0"]
+    candidates = [Version(x) for x in ("2.1", "2.2", "2.2.post2", "2.2.post3", "2.2.post4", "2.3", "2.9", "3.0a1", "3.0")]
+    assert [str(x) for x in VersionSpecifier("~=2.2.post3").filtered(candidates)] == ["2.2.post3", "2.2.post4", "2.3", "2.9"]
+    candidates = [Version(x) for x in ("1.4.4", "1.4.5a3", "1.4.5a4", "1.4.5", "1.4.6.dev1", "1.4.6", "1.5.0a1", "1.5.0")]
+    assert [str(x) for x in VersionSpecifier("~=1.4.5a4").filtered(candidates)] == ["1.4.5a4", "1.4.5", "1.4.6.dev1", "1.4.6"]
+    assert "3.12.10+local" in VersionSpecifier("==3.12.10")
+    assert "3.12.10+other" not in VersionSpecifier("==3.12.10+local")
+    assert "3.12.10.post1" not in VersionSpecifier(">3.12.10")
+    assert "3.12.10.post2" in VersionSpecifier(">3.12.10.post1")
+    candidates = [Version(x) for x in ("1.0a1", "1.0", "1.0.post0.dev1", "1.0.post0", "1.0.post1.dev1", "1.0.post1")]
+    spec = VersionSpecifier("<1.0.post1", prereleases=True)
+    assert [str(x) for x in spec.filtered(candidates)] == ["1.0a1", "1.0", "1.0.post0.dev1", "1.0.post0"]
+    assert "1.0.post1.dev1" in VersionSpecifier("<1.0.post1.dev2")
+    assert "1.0rc1.post1" not in VersionSpecifier(">1.0rc1")
+    assert "1.0rc2" in VersionSpecifier(">1.0rc1")
+    assert "foo" in VersionSpecifier("===foo")
+
+    # Artifacts are filtered by their version
+    artifacts = [ArtifactInfo.from_basename(f"foo-{x}.tar.gz") for x in ("1.0", "1.1", "2.0")]
+    assert str(VersionSpecifier("<2").highest(artifacts)) == "foo/foo-1.1.tar.gz"
+
+    for invalid in ("3.10", ">=foo", ">=3.*", "~=3", "~=3.10+local", "==3.10rc1.*"):
+        with pytest.raises(ValueError, match="Invalid version"):
+            VersionSpecifier(invalid)
+
+
 def verify_ordering(expected):
     # Jumble the given list of versions a bit, then sort them and verify they sort back to 'expected'
     given = sorted(expected, key=lambda x: x.text)
@@ -137,12 +137,15 @@ def test_json(temp_folder, monkeypatch):
         assert not logged
 
         with monkeypatch.context() as m:
-            m.setattr(runez.serialize, "open", exception_raiser(), raising=False)
+            m.setattr(io, "open", exception_raiser())
             assert runez.save_json(data, "sample.json", fatal=False) == -1
             assert "Can't save" in logged.pop()
 
         assert runez.save_json(data, "sample.json", logger=logging.debug) == 1
         assert "Saved " in logged.pop()
+        assert runez.save_json(data, "sample.json", atomic=True, fsync=True, logger=None) == 1
+        assert runez.read_json("sample.json") == data
+        assert [p.name for p in runez.ls_dir(".")] == ["sample.json"]  # Temp file was renamed
 
         with monkeypatch.context() as m:
             m.setattr(io, "open", exception_raiser())
@@ -435,6 +435,8 @@ def test_platform_identification():
     assert current.canonical_compress_extension("tar.bz2", short_form=True) == "bz2"
     assert current.canonical_compress_extension(".tar.gz", short_form=True) == "gz"
     assert current.canonical_compress_extension("tar.xz", short_form=True) == "xz"
+    assert current.canonical_compress_extension(".zst") == "tar.zst"
+    assert current.canonical_compress_extension("tar.zst", short_form=True) == "zst"
     with pytest.raises(ValueError, match="Invalid compression extension"):
         current.composed_basename("foo", extension="bar.zip")
 